@@ -5,10 +5,12 @@ For each load zone, this module combines the hydrogen demand profiles from on-ro
 It also combines 5x5km spatial distribution of on-road transport demand with that of industry demand.
 """
 
-import pandas as pd
-import geopandas as gpd
+import numpy as np
+import pyarrow as pa
+from pyarrow import csv
+import logging
 import os
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Define paths
@@ -16,51 +18,82 @@ outputs_path = Path(__file__).parent / 'outputs'
 combined_profiles_path = outputs_path / 'combined_profile'
 combined_grids_path = outputs_path / 'combined_grid'
 
-def combine():
-    print('\n===================\nCombining Results...\n==================')
+# Records of the inputs each combined output was built from. They are kept out of the combined folders, 
+# which are read directly by SWITCH
+input_keys_path = outputs_path / '.combine_keys'
 
-    print('\nCombining demand profiles...')
+logger = logging.getLogger(__name__)
+
+def combine(do_grids=True):
+    """
+    Combines the industry and transport results. Combined outputs whose inputs have not changed since they were 
+    written are kept as is. A full run_model run clears the outputs folder first, so this only saves time when 
+    combine is re-run on its own against existing model outputs.
+
+    Parameters:
+    - do_grids: whether to also combine the 5x5km demand grids (the profiles are always combined)
+
+    Returns: None
+    """
+    logger.info('\n===================\nCombining Results...\n==================')
+
+    logger.info('\nCombining demand profiles...')
     combine_profiles()
 
-    print('\nCombining demand grids...')
-    combine_demand_grids()
+    if do_grids:
+        logger.info('\nCombining demand grids...')
+        combine_demand_grids()
 
 def combine_demand_grids():
     """
     Combines the 5x5km resolution demand grids from industry and transport into a single grid
     for each model year, saving the result to the combined_grids folder in the outputs
     """
-    # Create new combined results folder
-    if combined_grids_path.exists():
-        shutil.rmtree(combined_grids_path)
-    combined_grids_path.mkdir()
+    # Imported here so that profile-only runs do not pay for the GDAL bindings
+    import pyogrio
+
+    # Create the combined results folder. Existing outputs are kept so that unchanged years can be skipped
+    combined_grids_path.mkdir(exist_ok=True)
 
     # Input folders
     industry_profiles_path = outputs_path / 'industry' 
     transport_profiles_path = outputs_path / 'transport'
 
+    # Remove combined grids of years that no longer have an industry grid
+    industry_grid_paths = sorted(industry_profiles_path.glob('*gpkg'))
+    remove_stale_outputs(combined_grids_path, '*_wecc_h2_demand_5km_combined.gpkg',
+                         {f"{path.stem.split('_')[0]}_wecc_h2_demand_5km_combined.gpkg" for path in industry_grid_paths})
+
     # Combine the profiles for each year
-    for industry_grid_path in industry_profiles_path.glob('*gpkg'):
+    for industry_grid_path in industry_grid_paths:
         year = industry_grid_path.stem.split('_')[0] 
+        transport_grid_path = transport_profiles_path / industry_grid_path.name
+        combined_output_path = combined_grids_path / f"{year}_wecc_h2_demand_5km_combined.gpkg"
+
+        # Skip the year if neither input has changed since its combined grid was written
+        if is_up_to_date(combined_output_path, [industry_grid_path, transport_grid_path]):
+            logger.debug('Combined %s demand grid is up to date', year)
+            continue
 
-        industry_grid = gpd.read_file(industry_grid_path)
-        transport_grid = gpd.read_file(transport_profiles_path / industry_grid_path.name)
+        # Both grids are built from the same vmt_grid_wecc.gpkg cells in the same order, so they are aligned
+        # by position and only the demand column is needed from the transport grid
+        industry_grid = pyogrio.read_dataframe(industry_grid_path, use_arrow=True)
+        transport_demand = pyogrio.read_dataframe(transport_grid_path,
+                                                  columns=['total_h2_demand_kg'], read_geometry=False, use_arrow=True)
 
-        # Merge by geometry
-        combined = industry_grid.merge(
-            transport_grid[['geometry', 'total_h2_demand_kg']],
-            on='geometry',
-            how='inner',
-            suffixes=('_industry', '_transport'))
+        if len(industry_grid) != len(transport_demand):
+            raise ValueError(f'The {year} industry and transport demand grids do not have the same number of cells')
 
         # Compute total demand
-        combined['total_h2_demand_kg'] = combined['total_h2_demand_kg_industry'] + combined['total_h2_demand_kg_transport']
+        industry_grid['total_h2_demand_kg'] = industry_grid['total_h2_demand_kg'].to_numpy() + transport_demand['total_h2_demand_kg'].to_numpy()
 
         # Save to combined grids folder
-        combined_output_path = combined_grids_path / f"{year}_wecc_h2_demand_5km_combined.gpkg"
-        combined.to_file(combined_output_path, driver='GPKG')
+        pyogrio.write_dataframe(industry_grid, combined_output_path, driver='GPKG', use_arrow=True)
+        record_inputs(combined_output_path, [industry_grid_path, transport_grid_path])
+
+        logger.debug('Combined %s demand grid (%d cells) saved to %s', year, len(industry_grid), combined_output_path)
 
-        print('\nCombined 5x5km demand grids saved. Model successfully run')
+    logger.info('\nCombined 5x5km demand grids saved. Model successfully run')
 
 def combine_profiles():
     """
@@ -68,10 +101,8 @@ def combine_profiles():
     for each load zone, saving the result to the combined_profiles folder in the outputs.
     """
 
-    # Create new combined results folder
-    if combined_profiles_path.exists():
-        shutil.rmtree(combined_profiles_path)
-    combined_profiles_path.mkdir()
+    # Create the combined results folder. Existing outputs are kept so that unchanged load zones can be skipped
+    combined_profiles_path.mkdir(exist_ok=True)
 
     # Input folders
     industry_profiles_path = outputs_path / 'industry' / 'demand_profiles'
@@ -81,40 +112,183 @@ def combine_profiles():
     industry_files = {f for f in os.listdir(industry_profiles_path) if f.endswith('.csv') and '~' not in f}
     transport_files = {f for f in os.listdir(transport_profiles_path) if f.endswith('.csv') and '~' not in f}
 
-    # Every load zone should have demand from transport, so we iterate by transport file
-    for file in transport_files:
-        # Initialize empty DataFrame
-        combined_df = pd.DataFrame()
+    # Every load zone profile spans the same model years, so the SWITCH time columns are built once and shared
+    transport_files = sorted(transport_files)
+    time_source_path = transport_profiles_path / transport_files[0] if transport_files else None
+    switch_time_columns = build_switch_time_columns(time_source_path) if transport_files else None
 
-        # Load available datasets
-        transport_df = pd.read_csv(transport_profiles_path / file) 
-        industry_df = pd.read_csv(industry_profiles_path / file) 
+    # Remove combined profiles of load zones that no longer have a transport profile
+    remove_stale_outputs(combined_profiles_path, '*_profile.csv', set(transport_files))
 
-        # Sum their values for h2 demand
-        # Reset index to ensure row alignment
-        transport_df = transport_df.reset_index(drop=True)
-        industry_df = industry_df.reset_index(drop=True)
+    # Every load zone should have demand from transport, so we iterate by transport file. Each load zone is
+    # independent and pyarrow releases the GIL while parsing and writing, so the zones are combined in parallel
+    max_workers = max(1, min(len(transport_files), os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(
+            lambda file: combine_one_profile(file, transport_profiles_path, industry_profiles_path,
+                                             combined_profiles_path, switch_time_columns, time_source_path),
+            transport_files))
 
-        combined_df = pd.DataFrame({
-            'datetime': transport_df['datetime'],
-            'h2_demand_kg': transport_df['total_h2_demand_kg'] + industry_df['total_h2_demand_kg']
-        })
+    logger.info("\nCombined profiles saved.")
 
-        # Add SWITCH timescale formatting
-        combined_df['datetime'] = pd.to_datetime(combined_df['datetime'])
-        combined_df['timepoint_id'] = range(len(combined_df))
-        combined_df['timeseries'] = combined_df['datetime'].dt.year.astype(str) + '_all'
 
-        combined_df = combined_df.rename(columns={'datetime': 'timestamp', 'total_h2_demand_kg': 'h2_demand_kg'})
-        combined_df['timestamp'] = pd.to_datetime(combined_df['timestamp']).dt.strftime('%Y-%m-%d-%H')
-        
-        # Organize the columns
-        combined_df = combined_df[['timepoint_id', 'timeseries', 'timestamp', 'h2_demand_kg']]
+def combine_one_profile(file, transport_profiles_path, industry_profiles_path, output_path, switch_time_columns,
+                        time_source_path):
+    """
+    Combines the transport and industry hydrogen demand profiles of a single load zone and saves
+    the SWITCH-formatted result.
+
+    Parameters:
+    - file: the name of the load zone profile CSV (shared by the transport and industry outputs)
+    - transport_profiles_path: folder containing the transport demand profiles
+    - industry_profiles_path: folder containing the industry demand profiles
+    - output_path: folder to which the combined profile is saved
+    - switch_time_columns: the SWITCH time columns shared by every load zone (see build_switch_time_columns)
+    - time_source_path: the profile from which switch_time_columns was built
+
+    Returns: None
+    """
+    input_paths = [transport_profiles_path / file, industry_profiles_path / file, time_source_path]
 
-        # Save result
-        combined_df.to_csv(combined_profiles_path / file, index=False)
+    # Skip the load zone if none of its inputs have changed since its combined profile was written
+    if is_up_to_date(output_path / file, input_paths):
+        return
 
-    print("\nCombined profiles saved.")
+    # Load available datasets and sum their values for h2 demand
+    h2_demand = read_h2_demand(transport_profiles_path / file) + read_h2_demand(industry_profiles_path / file)
 
+    if len(h2_demand) != len(switch_time_columns['timepoint_id']):
+        raise ValueError(f'The {file} profile does not span the same hours as the other load zone profiles')
+
+    # Save result
+    _fast_write_csv(output_path / file, {**switch_time_columns, 'h2_demand_kg': h2_demand})
+    record_inputs(output_path / file, input_paths)
+
+
+def _fast_write_csv(path, columns):
+    """
+    Writes a set of equal-length columns to a CSV through a single large buffered stream.
+
+    Parameters:
+    - path: path of the CSV to write
+    - columns: a dictionary mapping column names to pyarrow or numpy arrays, in output order
+
+    Returns: None
+    """
+    with open(path, 'wb', buffering=1 << 20) as fh:
+        csv.write_csv(pa.table(columns), fh, write_options=csv.WriteOptions(quoting_style='none'))
+
+
+def input_key_path(output_path):
+    """
+    Returns the path of the file recording the inputs an output was built from, in the input_keys_path folder.
+    """
+    return input_keys_path / output_path.parent.name / f'{output_path.name}.key'
+
+
+def input_key(input_paths):
+    """
+    Returns a key identifying the current state of the given input files, built from their modification times.
+    """
+    return ' '.join(str(path.stat().st_mtime_ns) for path in input_paths)
 
 
+def is_up_to_date(output_path, input_paths):
+    """
+    Checks whether an output exists and was built from the current versions of its inputs.
+
+    Parameters:
+    - output_path: path of the output file
+    - input_paths: paths of the files the output is built from
+
+    Returns:
+    - True if the output can be reused as is, False if it needs to be rebuilt
+    """
+    key_path = input_key_path(output_path)
+    if not (output_path.exists() and key_path.exists()):
+        return False
+    return key_path.read_text() == input_key(input_paths)
+
+
+def record_inputs(output_path, input_paths):
+    """
+    Records the current state of the inputs an output was built from (see is_up_to_date).
+    """
+    key_path = input_key_path(output_path)
+    key_path.parent.mkdir(parents=True, exist_ok=True)
+    key_path.write_text(input_key(input_paths))
+
+
+def remove_stale_outputs(output_folder, pattern, expected_names):
+    """
+    Deletes the combined outputs in a folder that the current inputs no longer produce, along with their input 
+    records. Only files matching the pattern of the combined outputs are considered, so other files in the 
+    folder are left alone.
+
+    Parameters:
+    - output_folder: the combined outputs folder
+    - pattern: glob pattern matching the combined outputs written to the folder
+    - expected_names: the names of the files the current inputs produce
+
+    Returns: None
+    """
+    for path in output_folder.glob(pattern):
+        if path.name not in expected_names:
+            path.unlink()
+            input_key_path(path).unlink(missing_ok=True)
+
+    # Input records used to be hidden files next to the outputs
+    for path in output_folder.glob(f'.{pattern}.key'):
+        path.unlink()
+
+
+def build_switch_time_columns(profile_path):
+    """
+    Builds the SWITCH timescale columns from the datetime column of an hourly demand profile.
+
+    Parameters:
+    - profile_path: path to a demand profile CSV with a 'datetime' column
+
+    Returns:
+    - a dictionary mapping 'timepoint_id', 'timeseries', and 'timestamp' to pyarrow arrays
+    """
+    datetimes = csv.read_csv(
+        profile_path,
+        read_options=csv.ReadOptions(block_size=1 << 20),
+        convert_options=csv.ConvertOptions(column_types={'datetime': pa.timestamp('s')}, include_columns=['datetime'])
+    ).column('datetime').to_numpy().astype('datetime64[h]')
+
+    # The profiles span only a handful of model years, so each year label is formatted once and then broadcast
+    years = datetimes.astype('datetime64[Y]').astype(np.int64) + 1970
+    unique_years, year_idx = np.unique(years, return_inverse=True)
+    year_labels = np.array([f'{year}_all' for year in unique_years])
+
+    # datetime_as_string gives 'YYYY-MM-DDTHH'; SWITCH expects 'YYYY-MM-DD-HH'
+    timestamps = np.char.replace(np.datetime_as_string(datetimes, unit='h'), 'T', '-')
+
+    return {
+        'timepoint_id': pa.array(np.arange(len(datetimes), dtype=np.int32)),
+        'timeseries': pa.array(year_labels[year_idx]),
+        'timestamp': pa.array(timestamps)
+    }
+
+
+def read_h2_demand(profile_path):
+    """
+    Reads the hourly hydrogen demand column of a demand profile.
+
+    Parameters:
+    - profile_path: path to a demand profile CSV with a 'total_h2_demand_kg' column
+
+    Returns:
+    - a float32 numpy array with the hourly hydrogen demand (kg). Single precision is ample for demand 
+        values and halves the bytes moved through the sum and the CSV writer
+    """
+    return csv.read_csv(
+        profile_path,
+        read_options=csv.ReadOptions(block_size=1 << 20),
+        convert_options=csv.ConvertOptions(
+            column_types={'total_h2_demand_kg': pa.float32()},
+            include_columns=['total_h2_demand_kg']
+        )
+    ).column('total_h2_demand_kg').to_numpy()
@@ -6,17 +6,88 @@ The create_dmeand_grid function saves a .gpkg file with the total industrial hyd
 broken down into 5x5km squares for a high spatial resolution output.
 """
 
-import geopandas as gp
-import matplotlib.pyplot as plt
 import numpy as np
-import matplotlib.patches as mpatches
+import os
 import pandas as pd
+import pyogrio
+import shapely
+from pyproj import Transformer
+from functools import lru_cache
 from pathlib import Path
 
 base_path  = Path(__file__).parent
+load_zones_path = base_path / 'inputs' / 'load_zones' / 'load_zones.shp'
+wecc_grid_path = base_path.parent / 'transport' / 'input_files' / 'vmt_grid_wecc.gpkg'
 
-# Import load zones file
-load_zones = gp.read_file(base_path / 'inputs' / 'load_zones' / 'load_zones.shp')
+# Resolution of the facility map. Set the WECC_H2_MAP_DPI environment variable (e.g. to 300) for higher quality maps
+map_dpi = int(os.environ.get('WECC_H2_MAP_DPI', 150))
+
+@lru_cache(maxsize=1)
+def get_load_zones():
+    """
+    Reads the load zones file once and caches it in EPSG:4326, along with a spatial index over the load 
+    zone geometries that is reused across model years. Reprojecting the load zones once means the facility 
+    coordinates can be used as is.
+
+    Returns:
+    - a GeoDataFrame of the WECC load zones in EPSG:4326
+    - a shapely STRtree built over the load zone geometries
+    - the (min lon, min lat, max lon, max lat) bounding box of the load zones
+    """
+    load_zones = pyogrio.read_dataframe(load_zones_path)
+
+    # Ensure CRS consistency
+    if load_zones.crs is None:
+        load_zones.set_crs("EPSG:4326", inplace=True)
+    load_zones = load_zones.to_crs("EPSG:4326")
+
+    return load_zones, shapely.STRtree(load_zones.geometry.values), lon_lat_bounds(load_zones)
+
+@lru_cache(maxsize=1)
+def get_wecc_grid():
+    """
+    Reads the 5x5km WECC grid once and caches it in EPSG:5070, along with a spatial index over the 
+    grid cells that is reused across model years. The cached grid is shared, so callers should not modify it.
+
+    Returns:
+    - a GeoDataFrame of the 5x5km grid cells spanning the WECC
+    - a shapely STRtree built over the grid cell geometries
+    - the (min lon, min lat, max lon, max lat) bounding box of the grid
+    """
+    wecc_grid = pyogrio.read_dataframe(wecc_grid_path, use_arrow=True).to_crs('EPSG:5070')
+
+    return wecc_grid, shapely.STRtree(wecc_grid.geometry.values), lon_lat_bounds(wecc_grid)
+
+def lon_lat_bounds(gdf):
+    """
+    Returns the bounding box of a GeoDataFrame as (min lon, min lat, max lon, max lat) in EPSG:4326.
+    """
+    transformer = Transformer.from_crs(gdf.crs, 'EPSG:4326', always_xy=True)
+    return transformer.transform_bounds(*gdf.total_bounds)
+
+def within_bounds(facility_df, bounds):
+    """
+    Returns a boolean array marking the facilities whose coordinates fall inside the given 
+    (min lon, min lat, max lon, max lat) bounding box. This is a cheap pre-filter before spatial queries.
+    """
+    min_lon, min_lat, max_lon, max_lat = bounds
+    lon = facility_df['Longitude'].to_numpy()
+    lat = facility_df['Latitude'].to_numpy()
+
+    return (lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)
+
+def project_facility_points(facility_df, crs):
+    """
+    Projects facility coordinates from EPSG:4326 to the given CRS, working on the raw coordinate 
+    arrays rather than building a GeoSeries.
+
+    Returns:
+    An array of shapely points in the given CRS
+    """
+    transformer = Transformer.from_crs('EPSG:4326', crs, always_xy=True)
+    x, y = transformer.transform(facility_df['Longitude'].to_numpy(), facility_df['Latitude'].to_numpy())
+
+    return shapely.points(x, y)
 
 def aggregate_by_lz(facility_df):
     """
@@ -30,35 +101,26 @@ def aggregate_by_lz(facility_df):
     A DataFrame displaying the total hydrogen demand across all facilities in each WECC load zone
     """
     
-    # Filter out any facilities with zero H2 demand 
-    results_by_facility_df = facility_df[facility_df['total_h2_demand_kg'] > 0].copy()
+    load_zones, load_zones_tree, load_zones_bounds = get_load_zones()
 
-    # Convert to GeoDataFrame
-    geometry = gp.points_from_xy(results_by_facility_df['Longitude'], results_by_facility_df['Latitude'])
-    facilities_gdf = gp.GeoDataFrame(results_by_facility_df, geometry=geometry, crs='EPSG:4326')
+    # Filter out any facilities with zero H2 demand or outside the load zones' bounding box
+    results_by_facility_df = facility_df[(facility_df['total_h2_demand_kg'] > 0).to_numpy() & within_bounds(facility_df, load_zones_bounds)]
 
-    # Ensure CRS consistency
-    if load_zones.crs is None:
-        load_zones.set_crs("EPSG:4326", inplace=True)
-    facilities_gdf = facilities_gdf.to_crs(load_zones.crs)
+    # The load zones are cached in EPSG:4326, so the facility coordinates need no transformation
+    facility_points = shapely.points(results_by_facility_df['Longitude'].to_numpy(), results_by_facility_df['Latitude'].to_numpy())
 
-    # Spatial join to get load areas
-    facilities_gdf = gp.sjoin(
-        facilities_gdf, 
-        load_zones[['LOAD_AREA', 'geometry']],  
-        how='inner',
-        predicate='within'
-    ).copy()
+    # Bulk point-in-polygon query to get load areas
+    facility_idx, load_zone_idx = load_zones_tree.query(facility_points, predicate='within')
 
-    # Keep only desired columns
-    facilities_gdf = facilities_gdf[results_by_facility_df.columns.tolist() + ['LOAD_AREA', 'geometry']]
+    load_areas = load_zones['LOAD_AREA'].to_numpy()[load_zone_idx]
+    facility_h2_demand = results_by_facility_df['total_h2_demand_kg'].to_numpy()[facility_idx]
 
-    # Create summary grouped by LOAD_AREA
-    load_zone_summary = facilities_gdf.groupby('LOAD_AREA', as_index=False)[
-        ['total_h2_demand_kg']
-    ].sum()
-
-    load_zone_summary.rename(columns={'LOAD_AREA': 'load_zone'}, inplace=True)
+    # Sum demand by LOAD_AREA (sorted by load zone name, as a groupby would be)
+    load_zone_names, load_zone_codes = np.unique(load_areas, return_inverse=True)
+    load_zone_summary = pd.DataFrame({
+        'load_zone': load_zone_names,
+        'total_h2_demand_kg': np.bincount(load_zone_codes, weights=facility_h2_demand, minlength=len(load_zone_names))
+    })
 
     return load_zone_summary
 
@@ -74,22 +136,29 @@ def plot(filtered_df, year):
 
     Returns: None
     """
-    filtered_df = filtered_df.copy()
-
-    #  Plotting setup 
-    filtered_df['Sector'] = filtered_df['Sector'].replace('Iron_and_Steel', 'Iron & Steel')
-    sectors = filtered_df['Sector'].unique()
+    # Imported here so that matplotlib is only loaded when a map is drawn. The maps are only saved to file,
+    # so the non-interactive Agg backend is used
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.patches as mpatches
+    import matplotlib.pyplot as plt
+
+    #  Plotting setup (the display labels are kept separate so the caller's DataFrame is neither modified nor copied).
+    #  Only the sectors present are labeled, in the order of the Sector categories
+    sector_labels = (filtered_df['Sector'].cat.remove_unused_categories()
+                     .cat.rename_categories({'Iron_and_Steel': 'Iron & Steel'}))
+    sectors = sector_labels.cat.categories
+    sector_codes = sector_labels.cat.codes.to_numpy()
 
     colors = plt.cm.Set1(np.linspace(0, 1, len(sectors)))
-    color_map = {sector: colors[i] for i, sector in enumerate(sectors)}
-    filtered_df['color'] = filtered_df['Sector'].map(color_map)
 
     # Normalize marker sizes
-    max_h2_demand = filtered_df['total_h2_demand_kg'].max()
+    h2_demand = filtered_df['total_h2_demand_kg'].to_numpy()
+    max_h2_demand = filtered_df['total_h2_demand_kg'].max()  # skips facilities with missing demand
     max_size = 900  # Adjust as needed
-    filtered_df['marker_size'] = (
-        (filtered_df['total_h2_demand_kg'] / max_h2_demand * max_size).clip(lower=1)
-        if max_h2_demand > 0 else 10
+    marker_sizes = (
+        np.maximum(h2_demand * (max_size / max_h2_demand), 1.0)
+        if max_h2_demand > 0 else np.full(len(h2_demand), 10)
     )
 
     # Create the plot
@@ -97,6 +166,7 @@ def plot(filtered_df, year):
 
     # Plot load zones
     try:
+        load_zones = get_load_zones()[0]
         load_zones.plot(ax=ax, color='lightgray', edgecolor='black', alpha=0.5)
     except Exception as e:
         print(f"Warning: Could not plot load zones: {e}")
@@ -109,22 +179,18 @@ def plot(filtered_df, year):
     ax.set_xlim(lon_min - lon_padding, lon_max + lon_padding)
     ax.set_ylim(lat_min - lat_padding, lat_max + lat_padding)
 
-    # Plot each sector 
-    legend_handles = []
-    for sector in sectors:
-        subset = filtered_df[filtered_df['Sector'] == sector]
-        if not subset.empty:
-            ax.scatter(
-                subset['Longitude'], 
-                subset['Latitude'],
-                s=subset['marker_size'],
-                c=[color_map[sector]],
-                label=sector,
-                alpha=0.75,
-                edgecolors='black',
-                linewidth=0.3
-            )
-            legend_handles.append(mpatches.Patch(color=color_map[sector], label=sector))
+    # Plot all facilities in a single collection, colored by sector (facilities without a sector are skipped)
+    has_sector = sector_codes >= 0
+    ax.scatter(
+        filtered_df['Longitude'].to_numpy()[has_sector],
+        filtered_df['Latitude'].to_numpy()[has_sector],
+        s=marker_sizes[has_sector],
+        c=colors[sector_codes[has_sector]],
+        alpha=0.75,
+        edgecolors='black',
+        linewidth=0.3
+    )
+    legend_handles = [mpatches.Patch(color=colors[i], label=sector) for i, sector in enumerate(sectors)]
 
     # Sector legend
     if legend_handles:
@@ -164,7 +230,7 @@ def plot(filtered_df, year):
 
      # Total hydrogen demand label for each sector
     sector_totals = (
-        filtered_df.groupby('Sector')['total_h2_demand_kg']
+        filtered_df['total_h2_demand_kg'].groupby(sector_labels, observed=True)
         .sum()
         .sort_values(ascending=False)
     )
@@ -190,7 +256,8 @@ def plot(filtered_df, year):
     plt.tight_layout()
 
     output_path_map = base_path.parent / 'outputs' / 'industry' / f'{year}_demand_by_facility.png'
-    plt.savefig(output_path_map, dpi=300, bbox_inches='tight')
+    plt.savefig(output_path_map, dpi=map_dpi, bbox_inches='tight')
+    plt.close(fig)
 
 
 def create_demand_grid(filtered_df, year):
@@ -206,29 +273,27 @@ def create_demand_grid(filtered_df, year):
     - Saves a GeoPackage containing the estimated hydrogen demand from industry in 5x5km-sized 
         square geometries. These squares constitute the entire WECC. 
     """
-    wecc_grid_path = base_path.parent / 'transport' / 'input_files' / 'vmt_grid_wecc.gpkg'
-    wecc_grid = gp.read_file(wecc_grid_path).copy().to_crs('EPSG:5070')
+    wecc_grid, grid_tree, grid_bounds = get_wecc_grid()
 
-    # Convert to GeoDataFrame
-    geometry = gp.points_from_xy(filtered_df['Longitude'], filtered_df['Latitude'])
-    facilities_gdf = gp.GeoDataFrame(filtered_df, geometry=geometry, crs='EPSG:4326')
+    # Skip facilities outside the grid's bounding box
+    grid_facilities_df = filtered_df[within_bounds(filtered_df, grid_bounds)]
 
-    # Ensure CRS match
-    if wecc_grid.crs != facilities_gdf.crs:
-        facilities_gdf = facilities_gdf.to_crs(crs='EPSG:5070')
+    # Convert facility locations to points in the grid's CRS
+    facility_points = project_facility_points(grid_facilities_df, wecc_grid.crs)
 
-    # Spatial join: assign each facility to a grid cell
-    joined = gp.sjoin(facilities_gdf, wecc_grid, how='left', predicate='within')
+    # Bulk spatial query: assign each facility to a grid cell
+    facility_idx, cell_idx = grid_tree.query(facility_points, predicate='within')
 
     # Aggregate demand per grid cell
-    demand_by_cell = joined.groupby('index_right')['total_h2_demand_kg'].sum().reset_index()
-
-    # Merge demand back onto the grid
-    result_grid = wecc_grid.merge(demand_by_cell, left_index=True, right_on='index_right', how='left')
-    result_grid['total_h2_demand_kg'] = result_grid['total_h2_demand_kg'].fillna(0)
+    demand_by_cell = np.bincount(
+        cell_idx,
+        weights=grid_facilities_df['total_h2_demand_kg'].to_numpy()[facility_idx],
+        minlength=len(wecc_grid)
+    )
 
-    # Drop unwanted columns
-    result_grid = result_grid.drop(columns=['LD_VMT', 'HD_VMT'])
+    # Drop unwanted columns and attach the demand to the grid
+    result_grid = wecc_grid.drop(columns=['LD_VMT', 'HD_VMT'])
+    result_grid['total_h2_demand_kg'] = demand_by_cell
 
     grid_output_path = base_path.parent / 'outputs' / 'industry' / f'{year}_wecc_h2_demand_5km_resolution.gpkg'
-    result_grid.to_file(grid_output_path, driver='GPKG')
+    pyogrio.write_dataframe(result_grid, grid_output_path, driver='GPKG', use_arrow=True)
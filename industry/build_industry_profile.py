@@ -8,11 +8,11 @@ The End Use Shape for Industrial Process Heating is used.
 https://loadshape.epri.com/enduse
 """
 
+from functools import lru_cache
 from pathlib import Path
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
-from transport.build_transport_profile import disaggregate_annual_to_hourly
+from transport.build_transport_profile import disaggregate_annual_to_hourly, save_profile
 
 # File paths
 base_path  = Path(__file__).parent
@@ -37,49 +37,50 @@ def build_profile(lz_summary_df):
     output_profiles_path = base_path.parent / 'outputs' / 'industry' / 'demand_profiles'
     output_profiles_path.mkdir()
 
-    # Load hourly profiles for weekday and weekend
-    demand_profile_df = pd.read_excel(profile_path)
-    weekday_profile = demand_profile_df[['Hour', 'Avg_Energy_Weekday']]
-    weekend_profile = demand_profile_df[['Hour', 'Avg_Energy_Weekend']]
-
-    # Create an array containing the hourly fuel demand profile from industry over the course of a week (starting Sunday)
-    weekly_profile = generate_one_week_normalized_profile(weekday_profile, weekend_profile)
-    weekly_profile_array = weekly_profile['demand'].values
+    # Work on the raw column arrays rather than through label-based row access
+    load_zones = lz_summary_df['load_zone'].to_numpy()
+    years = lz_summary_df['year'].to_numpy()
+    h2_demands = lz_summary_df['total_h2_demand_kg'].to_numpy()
 
     # Find load zone and year combination with highest demand (for plotting purposes)
-    row = lz_summary_df.loc[lz_summary_df['total_h2_demand_kg'].idxmax()]
-    highest_demand_lz = str(row['load_zone'])
-    highest_demand_year = int(row['year'])
+    i_max = int(np.nanargmax(h2_demands))
+    highest_demand_lz = str(load_zones[i_max])
+    highest_demand_year = int(years[i_max])
+
+    # Scale each year's shared hourly allocation by the demand of every load zone in that year in one operation
+    # (one row of hourly demand per load zone)
+    hourly_demand_by_row = {}
+    for year in np.unique(years):
+        rows = np.flatnonzero(years == year)
+        year_hourly_demand = np.multiply.outer(h2_demands[rows], get_hourly_allocation(year)['hourly_value'].to_numpy())
+        hourly_demand_by_row.update(zip(rows, year_hourly_demand))
 
     # Get the first load_zone in the DataFrame
-    previous_load_zone = lz_summary_df.iloc[0].loc['load_zone']
+    previous_load_zone = load_zones[0]
     
-    # Create a DataFrame which will contain the all the yearly profiles for one load zone, stacked on top of each other
-    profile_across_years = pd.DataFrame()
+    # Collects the yearly profiles for one load zone, which are stacked on top of each other when the zone is saved
+    profile_across_years = []
 
     # Process each load zone/year combination
-    for _, lz_row in lz_summary_df.iterrows():
-        load_zone = lz_row['load_zone']
-        year = lz_row['year']
-
+    for row, (load_zone, year) in enumerate(zip(load_zones, years)):
         # Save results when moving on to a new load zone
         if load_zone != previous_load_zone:
-            output_path = output_profiles_path / f'{previous_load_zone}_profile.csv'
-            profile_across_years = profile_across_years.sort_values(by='datetime').reset_index(drop=True)
-            profile_across_years.to_csv(output_path, index=False)
+            save_profile(profile_across_years, output_profiles_path / f'{previous_load_zone}_profile.csv')
 
             # Update for next iteration
-            profile_across_years = pd.DataFrame()
+            profile_across_years = []
             previous_load_zone = load_zone
 
-        h2_demand = lz_row['total_h2_demand_kg']
-
         # Generate the profile for one year
-        one_year_profile = disaggregate_annual_to_hourly(h2_demand, weekly_profile_array, np.full(53, 1), year)
-        one_year_profile = one_year_profile.rename(columns={'hourly_value': 'total_h2_demand_kg'})
+        hourly_allocation = get_hourly_allocation(year)
+        one_year_profile = pd.DataFrame({
+            'datetime': hourly_allocation['datetime'],
+            'day_of_week': hourly_allocation['day_of_week'],
+            'total_h2_demand_kg': hourly_demand_by_row[row]
+        })
 
-        # Join to make a combined DataFrame with the profiles across all years within a load zone
-        profile_across_years = pd.concat([profile_across_years, one_year_profile], ignore_index=True)
+        # Collect the profiles across all years within a load zone
+        profile_across_years.append(one_year_profile)
 
         # Plot for highest demand zone/year combination
         if load_zone == highest_demand_lz and year == highest_demand_year:
@@ -87,13 +88,42 @@ def build_profile(lz_summary_df):
             plot_demand_profile(one_year_profile, load_zone, plot_output_path)
 
     # Save the profile for the last load zone
-    output_path = output_profiles_path / f'{load_zone}_profile.csv'
-    profile_across_years.to_csv(output_path, index=False)
-    profile_across_years = profile_across_years.sort_values(by='datetime').reset_index(drop=True)
+    save_profile(profile_across_years, output_profiles_path / f'{load_zone}_profile.csv')
 
     print(f'\nProfiles saved to {output_profiles_path}')
 
 
+@lru_cache(maxsize=1)
+def get_weekly_profile():
+    """
+    Reads the EPRI weekday and weekend profiles once and caches the normalized one-week profile built 
+    from them, so the workbook is only parsed once per run.
+
+    Returns:
+    - a numpy array of length 168 with the normalized hourly demand over a week, starting Sunday at midnight
+    """
+    demand_profile_df = pd.read_excel(profile_path, usecols=['Hour', 'Avg_Energy_Weekday', 'Avg_Energy_Weekend'])
+    weekday_profile = demand_profile_df[['Hour', 'Avg_Energy_Weekday']]
+    weekend_profile = demand_profile_df[['Hour', 'Avg_Energy_Weekend']]
+
+    return generate_one_week_normalized_profile(weekday_profile, weekend_profile)
+
+
+@lru_cache(maxsize=None)
+def get_hourly_allocation(year):
+    """
+    Disaggregates one unit of annual demand over the hours of the given year. Every load zone uses the 
+    same industry profile, so this is computed once per model year and scaled by each zone's demand.
+
+    Parameters:
+    - year: the model year
+
+    Returns:
+    - a DataFrame with 'datetime', 'day_of_week', and 'hourly_value' columns, where 'hourly_value' sums to 1
+    """
+    return disaggregate_annual_to_hourly(1.0, get_weekly_profile(), np.full(53, 1), int(year))
+
+
 def generate_one_week_normalized_profile(weekday_profile, weekend_profile):
     """
     Generates a normalized one-week (168-hour) energy profile using the second column of each
@@ -104,35 +134,17 @@ def generate_one_week_normalized_profile(weekday_profile, weekend_profile):
     - weekend_profile: Same format as above
 
     Returns:
-    - DataFrame with columns: 'hour' (0 to 167) and 'Energy' (normalized to sum to 1). Hour
-        0 begins Sunday at midnight. Hour 167 is Saturday at 11 pm.
+    - a numpy array of length 168 with the hourly energy, normalized to sum to 1. Hour 0 begins
+        Sunday at midnight. Hour 167 is Saturday at 11 pm.
     """
-    hours = []
-    energy_values = []
-
-    weekday_energy = weekday_profile.iloc[:, 1]
-    weekend_energy = weekend_profile.iloc[:, 1]
-
-    for h in range(7 * 24):  # 168 hours
-        day = h // 24  # 0 = Sunday, ..., 6 = Saturday
-        hour_of_day = h % 24
+    weekday_energy = weekday_profile.iloc[:, 1].to_numpy()
+    weekend_energy = weekend_profile.iloc[:, 1].to_numpy()
 
-        if day in [0, 6]:  # Sunday or Saturday
-            energy = weekend_energy.iloc[hour_of_day]
-        else:
-            energy = weekday_energy.iloc[hour_of_day]
-
-        hours.append(h)
-        energy_values.append(energy)
+    # Sunday, Monday to Friday, then Saturday
+    energy_array = np.concatenate([weekend_energy, np.tile(weekday_energy, 5), weekend_energy])
 
     # Normalize to sum to 1
-    energy_array = np.array(energy_values)
-    energy_normalized = energy_array / energy_array.sum()
-
-    return pd.DataFrame({
-        'hour': range(168),
-        'demand': energy_normalized
-    })
+    return energy_array / energy_array.sum()
 
 
 def plot_demand_profile(profile_df, lz_name, plot_output_path):
@@ -146,6 +158,11 @@ def plot_demand_profile(profile_df, lz_name, plot_output_path):
 
     Returns: None
     """
+    # matplotlib is only needed for this plot, which is saved to file, so it is loaded here with the Agg backend
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     total_demand = profile_df['total_h2_demand_kg'].sum()
 
     plt.figure(figsize=(12, 5))
@@ -9,9 +9,10 @@ import pandas as pd
 import numpy as np
 import os
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from industry import aggregate_and_plot 
-from functools import lru_cache
+from functools import lru_cache, partial
 
 
 #======================
@@ -23,6 +24,11 @@ base_path  = Path(__file__).parent
 # Fuel consumption by facility unit and fuel
 units_and_fuel_folder = base_path / 'inputs' / 'sector_breakdown_by_unit_fuel' 
 
+# Columns of the sector breakdown files that are used in the model
+sector_breakdown_columns = ['Facility Id', 'Facility Name_x', 'Latitude', 'Longitude', 'Unit Name', 'Primary NAICS Code_y', 
+                            'Unit CO2 emissions (non-biogenic)', 'Specific Fuel Type', 'inWECC', 'inWestCensus']
+sector_text_columns = ['Facility Name_x', 'Unit Name', 'Specific Fuel Type']
+
 # Emissions factors (kg CO2 / mmBtu) for each fuel
 fuel_emissions_factor_path = base_path / 'inputs' / 'epa_fuel_ghg_emission_factors.xlsx' 
 
@@ -41,11 +47,8 @@ co2_emissions_breakdown_path = base_path / 'inputs' / 'doe_co2_emissions_breakdo
 # Existing hydrogen production facilities (EPA GHGRP facilities with 'Hydrogen Production' emissions)
 existing_h2_plants_path = base_path / 'inputs' / 'wecc_existing_h2_plants_2022.csv'
 
-# Create a new logs path
+# Logs path (recreated at the start of each model run, not at import)
 logs_path = base_path / 'logs'
-if logs_path.exists():
-    shutil.rmtree(logs_path)
-logs_path.mkdir()
 
 # Final output path
 load_zone_output_path = base_path.parent / 'outputs' / 'industry' / 'demand_by_load_zone.csv'
@@ -57,70 +60,133 @@ load_zone_output_path = base_path.parent / 'outputs' / 'industry' / 'demand_by_l
 ONE_MILLION = 10 ** 6
 BTU_IN_1LB_H2 = 61013
 LB_TO_KG = 0.453592
+KG_H2_PER_MMBTU = ONE_MILLION / BTU_IN_1LB_H2 * LB_TO_KG
 
 sector_by_naics = {'Iron_and_Steel': [331110, 331511, 3312], 'Aluminum': [3313], 'Cement': [327310],
                    'Chemicals': [325], 'Refineries': [324110], 'Glass': [ 327211, 
                     327212, 327213, 327215]}
 
+# Categorical dtype shared by every Sector column, so that frames from different sectors keep it when concatenated
+sector_dtype = pd.CategoricalDtype([*sector_by_naics.keys(), 'Existing Hydrogen Plants'])
+
 #====================
 # Helper Functions:
 #====================
 
+# (code prefix, sector, code) for every NAICS code used in the model, in the order of sector_by_naics
+naics_prefixes = [(str(code), sector, code) for sector, codes in sector_by_naics.items() for code in codes]
+
+# Codes that exactly match a model code (most facility codes) resolve with a single dict lookup
+naics_by_code_str = {prefix: (sector, code) for prefix, sector, code in naics_prefixes}
+
+@lru_cache(maxsize=None)
+def resolve_naics(naics_str):
+    """
+    Returns the (sector, naics code) pair used in our model for the input naics code string, or (None, None)
+    if it does not belong to a modeled sector. Codes are matched by prefix and each distinct code is only 
+    resolved once.
+    """
+    exact_match = naics_by_code_str.get(naics_str)
+    if exact_match is not None:
+        return exact_match
+
+    for prefix, sector, code in naics_prefixes:
+        if naics_str.startswith(prefix):
+            return sector, code
+    return None, None
+
 def get_naics_code(naics):
     """
     Returns the naics code (int) used in our model, corresponding to the input naics code (str or int).
 
     Ex: 325121 -> 325, 327211 -> 327211
     """
-    naics_str = str(naics)
-    for sector, codes in sector_by_naics.items():
-        for code in codes:
-            code_str = str(code)
-            # Exact match
-            if naics_str == code_str:
-                return int(code_str)
-            # Prefix match
-            if naics_str.startswith(code_str):
-                return int(code_str)
-    return None
+    return resolve_naics(str(naics))[1]
 
 def get_sector(naics):
     """
     Returns the sector (str) that corresponds to the input naics code (str or int).
     """
-    naics_str = str(naics)
-    sector = None
-    for key, codes in sector_by_naics.items():
-        for code in codes:
-            if naics_str.startswith(str(code)):
-                sector = key
-                break
-        if sector:
-            break
-    return sector
+    return resolve_naics(str(naics))[0]
+
+def parquet_copy(path):
+    """
+    Returns the path of the Parquet copy of an input file (written by pre-processing/convert_inputs_to_parquet.py), 
+    or None if there is no copy or it is older than the original file.
+    """
+    parquet_path = path.with_suffix('.parquet')
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= path.stat().st_mtime:
+        return parquet_path
+    return None
+
+@lru_cache(maxsize=1)
+def get_fuel_emissions_factors():
+    """
+    Returns the EPA fuel emissions factor table (DataFrame). The table is only read once per run, from its Parquet
+    copy if there is an up to date one.
+    """
+    parquet_path = parquet_copy(fuel_emissions_factor_path)
+    if parquet_path is not None:
+        return pd.read_parquet(parquet_path, engine='pyarrow')
+    return pd.read_excel(fuel_emissions_factor_path)
+
+@lru_cache(maxsize=1)
+def get_fuel_lookup_dicts():
+    """
+    Returns a dictionary mapping each fuel type to its CO2 emissions factor (kg CO2 / mmBtu), and a dictionary 
+    mapping each fuel type to the broader EIA AEO fuel category for which we have fuel consumption projections.
+    """
+    fuel_emissions_df = get_fuel_emissions_factors().set_index('Fuel Type')
+    fuel_emissions_dict = fuel_emissions_df['kg CO2 per mmBtu'].to_dict()
+    aeo_fuel_category_dict = fuel_emissions_df['EIA AEO Category'].to_dict()
+
+    return fuel_emissions_dict, aeo_fuel_category_dict
 
-def get_high_heat_emissions_share(sector):
+@lru_cache(maxsize=1)
+def get_high_heat_emissions_shares():
     """
-    Returns the share of CO2 emissions associated with high-temperature combustion 
-    relative to all combustion emissions in the given sector.
+    Returns a dictionary mapping each sector to the share of CO2 emissions associated with high-temperature 
+    combustion relative to all combustion emissions in the sector.
     """
     
     # Read the input data from the DOE Pathways from Commercial Liftoff: Industrial Decarbonization report
-    co2_emissions_df = pd.read_csv(co2_emissions_breakdown_path)
-
-    # Filter for the input sector
-    sector_row = co2_emissions_df[co2_emissions_df['Sector'] == sector]
+    co2_emissions_df = pd.read_csv(co2_emissions_breakdown_path, engine='pyarrow').drop_duplicates('Sector').set_index('Sector')
     
     # Compute total combustion (denominator)
-    total_combustion = sector_row[['low_temp_heat', 'mid_temp_heat', 'high_temp_heat', 'on_site_power']].sum(axis=1).iloc[0]
+    total_combustion = co2_emissions_df[['low_temp_heat', 'mid_temp_heat', 'high_temp_heat', 'on_site_power']].sum(axis=1)
 
     # Compute share (high-temp / total combustion)
-    high_heat_share = sector_row['high_temp_heat'].iloc[0] / total_combustion
+    high_heat_shares = co2_emissions_df['high_temp_heat'] / total_combustion
+
+    return high_heat_shares.to_dict()
+
+@lru_cache(maxsize=1)
+def get_mecs_fuel_data():
+    """
+    Returns the EIA MECS fuel consumption data (DataFrame), with the NAICS codes read as strings. The cached 
+    DataFrame is shared, so callers must not modify it in place.
+    """
+    return pd.read_csv(mecs_data_path, dtype={"NAICS Code": str})
+
+@lru_cache(maxsize=1)
+def get_fuel_use_projections():
+    """
+    Returns the EIA AEO25 industrial fuel use projections by fuel category (DataFrame), indexed by year.
+    """
+    return pd.read_csv(fuel_use_projection_path, header=4).set_index('Year')
+
+@lru_cache(maxsize=1)
+def get_mecs_to_aeo_fuel_category_map():
+    """
+    Returns a dictionary mapping each EIA MECS fuel type to its corresponding AEO25 fuel category.
+    """
+    emissions_factors_df = get_fuel_emissions_factors()
+    emissions_factors_df = emissions_factors_df[~emissions_factors_df['EIA MECS Category'].isna()].groupby('EIA MECS Category').first()
+
+    return emissions_factors_df['EIA AEO Category'].to_dict()
 
-    return high_heat_share
-    
 
-def calc_discrepancies(results_by_facility_df):
+def calc_discrepancies(results_by_facility_df, year, mecs_fuel_data):
     """
     Calculates the discrepancy between our fuel consumption estimates obtained using EPA GHGRP data
     and fuel consumption totals from the EIA MECS Survey. The comparison is made across the West Census
@@ -129,16 +195,19 @@ def calc_discrepancies(results_by_facility_df):
     Parameters:
     - results_by_facility_df: a DataFrame containing GHGRP-derived fuel consumption estimates by
         industrial facility in the WECC and West Census Region (union)
+    - year: the model year, used to name the log files
+    - mecs_fuel_data: the EIA MECS fuel consumption data (see get_mecs_fuel_data)
 
     Returns:
     - a DataFrame containing the discrepancy in fuel demand for each sector (in MMBtu) 
     """
 
-    west_breakdown_by_fuel_df = results_by_facility_df[results_by_facility_df['inWestCensus'] == True].copy()
-    west_breakdown_by_fuel_df['NAICS Code'] = west_breakdown_by_fuel_df['NAICS Code'].astype(str).str.split('.').str[0]
+    west_breakdown_by_fuel_df = results_by_facility_df.loc[results_by_facility_df['inWestCensus'] == True]
+    west_naics_codes = west_breakdown_by_fuel_df['NAICS Code'].astype(str).str.split('.').str[0]
 
-    west_breakdown_by_fuel_df_grouped = west_breakdown_by_fuel_df.groupby('NAICS Code')
-    mecs_data = pd.read_csv(mecs_data_path, index_col='NAICS Code', dtype={"NAICS Code": str})
+    # Total GHGRP fuel demand of each NAICS code, computed in one pass (codes without facilities are treated as 0 below)
+    ghgrp_fuel_totals_by_naics = west_breakdown_by_fuel_df['fuel_demand_mmBtu'].groupby(west_naics_codes).sum()
+    mecs_data = mecs_fuel_data.set_index('NAICS Code')
 
     mecs_data = (
         mecs_data
@@ -151,32 +220,20 @@ def calc_discrepancies(results_by_facility_df):
     mecs_data['total_fossil_mmbtu'] = (mecs_data['Residual Fuel Oil'] + mecs_data['Distillate Fuel Oil'] + mecs_data['Natural Gas'] + \
         mecs_data['HGL (excluding natural gasoline)'] + mecs_data['Coal'] + mecs_data['Coke and Breeze']) * 1e6
 
-    discrepancy_list = []
+    all_naics = pd.Index([str(code) for codes in sector_by_naics.values() for code in codes], name='NAICS Code')
 
-    all_naics = [str(code) for codes in sector_by_naics.values() for code in codes]
-    
-    for naics in all_naics:
-        naics = str(naics)
-
-        try:
-            fuel_df = west_breakdown_by_fuel_df_grouped.get_group(naics)
-            ghgrp_fuel_total_mmbtu = fuel_df['fuel_demand_mmBtu'].sum() 
-        except:
-            ghgrp_fuel_total_mmbtu = 0
-        
-        # Convert from trillion btu to mmbtu
-        mecs_fuel_total_mmbtu = mecs_data.loc[naics, 'total_fossil_mmbtu']
+    # Line up the GHGRP and MECS totals of every modeled NAICS code (codes without GHGRP facilities have 0 demand)
+    ghgrp_fuel_total_mmbtu = ghgrp_fuel_totals_by_naics.reindex(all_naics, fill_value=0).to_numpy(dtype=float)
+    mecs_fuel_total_mmbtu = mecs_data['total_fossil_mmbtu'].reindex(all_naics).to_numpy(dtype=float)
 
-        discrepancy_mmbtu = int(mecs_fuel_total_mmbtu) - ghgrp_fuel_total_mmbtu
-        if ghgrp_fuel_total_mmbtu != 0:
-            mecs_to_ghgrp_ratio = mecs_fuel_total_mmbtu / ghgrp_fuel_total_mmbtu
-        else:
-            mecs_to_ghgrp_ratio = np.inf
+    # The MECS total is truncated to a whole number of mmBtu before taking the difference
+    discrepancy_mmbtu = np.trunc(mecs_fuel_total_mmbtu) - ghgrp_fuel_total_mmbtu
+    mecs_to_ghgrp_ratio = np.divide(mecs_fuel_total_mmbtu, ghgrp_fuel_total_mmbtu,
+                                    out=np.full_like(mecs_fuel_total_mmbtu, np.inf), where=ghgrp_fuel_total_mmbtu != 0)
 
-        discrepancy_list.append({'NAICS Code': naics, 'Sector': get_sector(naics), 'mecs_mmbtu': mecs_fuel_total_mmbtu, 'ghgrp_mmbtu': ghgrp_fuel_total_mmbtu, \
-                                 'discrepancy_mmbtu': discrepancy_mmbtu, 'mecs_to_ghgrp_ratio': mecs_to_ghgrp_ratio})
-        
-    naics_discrepancy_df = pd.DataFrame(discrepancy_list)
+    naics_discrepancy_df = pd.DataFrame({'NAICS Code': all_naics, 'Sector': all_naics.map(get_sector), 
+                                         'mecs_mmbtu': mecs_fuel_total_mmbtu, 'ghgrp_mmbtu': ghgrp_fuel_total_mmbtu,
+                                         'discrepancy_mmbtu': discrepancy_mmbtu, 'mecs_to_ghgrp_ratio': mecs_to_ghgrp_ratio})
 
     # Sum discrepancies within each sector
     sector_discrepancy_df = naics_discrepancy_df.groupby('Sector').agg(
@@ -192,24 +249,37 @@ def calc_discrepancies(results_by_facility_df):
     sector_discrepancy_df = sector_discrepancy_df.sort_values('discrepancy_mmbtu', ascending=False)
 
     # Save outputs
-    naics_discrepancy_df.to_csv(logs_path / 'discrepancies_by_naics.csv', index=False)
-    sector_discrepancy_df.to_csv(logs_path / 'sector_discrepancies.csv', index=False)
+    naics_discrepancy_df.to_csv(logs_path / f'{year}_discrepancies_by_naics.csv', index=False)
+    sector_discrepancy_df.to_csv(logs_path / f'{year}_sector_discrepancies.csv', index=False)
 
     return sector_discrepancy_df
 
-def project_sector_consumption(sector, fuel_use, year):
+@lru_cache(maxsize=1)
+def get_fuel_growth_table():
+    """
+    Returns the relative growth in industrial fuel use from 2022 for every EIA AEO25 fuel category (columns) and 
+    projection year (index). Categories with no fuel use in 2022 have an undefined (NaN) growth.
     """
-    Projects the total fuel consumption for an entire given sector into the input year.
+    # Load industrial fuel use projections from 2022 to 2050 (assuming 2022-2023 has the same relative change as 2023-2024)
+    fuel_use = get_fuel_use_projections()
 
-    Parameters:
-    - sector: an industry sector (str)
-    - fuel use: the total fuel use in the given sector in the base year of 2022 
-    - year: a future model year (int)
+    # Divide every year by the base year (2022) in one pass so each model year only needs a row lookup
+    return fuel_use.div(fuel_use.loc[2022].replace(0, np.nan), axis=1) - 1
 
-    Returns:
-    -  a fuel use value projected to the future year, in the same units as the input fuel use
+def calc_fuel_growth_by_category(year):
+    """
+    Returns a dictionary mapping each EIA AEO25 fuel category to the relative growth in its industrial fuel use 
+    from 2022 to the input year. Categories with no fuel use in 2022 have an undefined (NaN) growth.
+    """
+    return get_fuel_growth_table().loc[year].to_dict()
+
+@lru_cache(maxsize=None)
+def get_sector_growth_factor(sector, year):
     """
-    mecs_fuel_data = pd.read_csv(mecs_data_path)
+    Returns the factor by which the total fuel consumption of the given sector grows from 2022 to the input year,
+    weighting the growth of each fuel type by its share of the sector's fuel use in the EIA MECS data.
+    """
+    mecs_fuel_data = get_mecs_fuel_data()
 
     # Rename to match classifications used in the MECS fuel data DataFrame
     if sector == 'Iron_and_Steel':
@@ -226,88 +296,65 @@ def project_sector_consumption(sector, fuel_use, year):
     )    
     sector_fuel_consumption = mecs_sector_row[1:]
 
-    # Create a dictionary mapping each MECS fuel type to its corresponding AEO25 fuel category
-    emissions_factors_df = pd.read_excel(fuel_emissions_factor_path)
-    emissions_factors_df = emissions_factors_df[~emissions_factors_df['EIA MECS Category'].isna()].groupby('EIA MECS Category').first().reset_index()
-
-    mecs_to_aeo_fuel_category_map = (
-        emissions_factors_df[['EIA MECS Category', 'EIA AEO Category']]
-        .set_index('EIA MECS Category')['EIA AEO Category']
-        .to_dict()
-    )
-
-    # Get the fuel use projections by AEO25 category
-    fuel_use_projections_df = pd.read_csv(fuel_use_projection_path, header=4)
-    fuel_use_by_category_filtered = fuel_use_projections_df[fuel_use_projections_df['Year'].isin([2022, year])].reset_index(drop=True)
-
-    # Create a dictionary mapping each fuel category to the relative growth it experiences from 2022 to the model year
-    fuel_growth_by_category_dict = {
-        col: (fuel_use_by_category_filtered[col].iloc[1] - fuel_use_by_category_filtered[col].iloc[0]) / fuel_use_by_category_filtered[col].iloc[0]
-        for col in fuel_use_by_category_filtered.columns if col != 'Year'
-    }
-
-    # Get the scaling factor from 2022 to the input year for the sector
-    base_year_fuel_use = 0
-    projected_fuel_use = 0
-
-    for mecs_fuel_type in sector_fuel_consumption.index:
-        fuel_use_mmbtu = sector_fuel_consumption[mecs_fuel_type] * 1e6
-
-        if fuel_use_mmbtu != 0:
-            base_year_fuel_use += fuel_use_mmbtu
+    # Look up the AEO25 fuel category of each MECS fuel type
+    mecs_to_aeo_fuel_category_map = get_mecs_to_aeo_fuel_category_map()
 
-            aeo_fuel_type = mecs_to_aeo_fuel_category_map[mecs_fuel_type]
-            projected_fuel_use += fuel_use_mmbtu * (1 + fuel_growth_by_category_dict[aeo_fuel_type])
+    # Get the relative growth of each AEO25 fuel category from 2022 to the model year
+    fuel_growth_by_category_dict = calc_fuel_growth_by_category(year)
 
-    growth_factor = projected_fuel_use / base_year_fuel_use
+    # Get the scaling factor from 2022 to the input year for the sector, weighting each fuel type's growth by its
+    # fuel use. Fuel types without an AEO25 category or projection are assumed to have 0% growth
+    fuel_use_mmbtu = sector_fuel_consumption.astype(float) * 1e6
+    fuel_use_mmbtu = fuel_use_mmbtu[fuel_use_mmbtu != 0]
 
-    return growth_factor * fuel_use
+    fuel_growth = (
+        fuel_use_mmbtu.index.to_series()
+        .map(mecs_to_aeo_fuel_category_map)
+        .map(fuel_growth_by_category_dict)
+        .fillna(0.0)
+        .to_numpy(dtype=float)
+    )
 
-# Wrap the function so it can be cached
-@lru_cache(maxsize=None)
-def cached_project_sector_consumption(sector, fuel_demand, year):
-    return project_sector_consumption(sector, fuel_demand, year)
+    return (fuel_use_mmbtu.to_numpy() * (1 + fuel_growth)).sum() / fuel_use_mmbtu.sum()
 
 
-def model_one_year(existing_h2_pct_decarb, high_temp_decarb_by_sector, year):
+def model_one_year(existing_h2_pct_decarb, high_temp_decarb_by_sector, year, fuel_growth_by_category_dict, 
+                   sector_growth_factors, sector_bases, mecs_fuel_data, high_heat_shares):
     """
-    Models industrial hydrogen demand for a single model year.
+    Models industrial hydrogen demand for a single model year. The year-independent inputs are computed once per 
+    run by model_industry_demand and passed in.
 
     Parameters:
     - existing_h2_pct_decarb: the percentage of existing hydrogen demand to model
     - high_temp_decarb_by_sector: A list containing the percent decarbonization of projected 
         fuel use high-temp combustion via hydrogen for each industrial sector.
     - year: The model year for which industrial hydrogen demand is being modeled.
+    - fuel_growth_by_category_dict: a mapping of EIA AEO fuel categories to their relative growth from 2022 to the 
+        model year (see calc_fuel_growth_by_category)
+    - sector_growth_factors: a mapping of each sector to the growth factor of its total fuel use from 2022 to the 
+        model year (see get_sector_growth_factor)
+    - sector_bases: the base year fuel consumption of each sector (see get_sector_fuel_consumption)
+    - mecs_fuel_data: the EIA MECS fuel consumption data (see get_mecs_fuel_data)
+    - high_heat_shares: a mapping of each sector to its share of high-temp combustion emissions 
+        (see get_high_heat_emissions_shares)
 
     Returns:
     - A DataFrame containing total hydrogen demand (kg) by load zone for the specified year.
     """
+    # Map each sector to its percent decarbonization (the list is ordered like the keys of sector_by_naics)
+    high_temp_decarb_pct_by_sector = dict(zip(sector_by_naics.keys(), high_temp_decarb_by_sector))
+
     #========================
     # Step 1: Calculate fuel consumption using EPA GHGRP stationary combustion emissions and emissions factors
     #========================
 
-    # Load industrial fuel use projections from 2022 to 2050 (assuming 2022-2023 has the same relative change as 2023-2024)
-    fuel_use_by_category_df = pd.read_csv(fuel_use_projection_path, header=4)
-
-    # Filter for the base year (2022) and the model year
-    fuel_use_by_category_filtered = fuel_use_by_category_df[fuel_use_by_category_df['Year'].isin([2022, year])].reset_index(drop=True)
-
-    # Create a dictionary mapping each fuel category to the relative growth it experiences from 2022 to the model year
-    fuel_growth_by_category_dict = {
-        col: (fuel_use_by_category_filtered[col].iloc[1] - fuel_use_by_category_filtered[col].iloc[0]) / fuel_use_by_category_filtered[col].iloc[0]
-        for col in fuel_use_by_category_filtered.columns if col != 'Year'
-    }
-
     # Call the helper function to perform calculcations and retrieve results
-    results_by_facility, breakdown_by_fuel = calc_epa_ghgrp_fuel_consumption(high_temp_decarb_by_sector, fuel_growth_by_category_dict)
-
-    # Save output lists as DataFrames
-    results_by_facility_df = pd.DataFrame(results_by_facility)
-    breakdown_by_fuel_df = pd.DataFrame(breakdown_by_fuel)
+    results_by_facility_df, breakdown_by_fuel_df = calc_epa_ghgrp_fuel_consumption(
+        high_temp_decarb_pct_by_sector, fuel_growth_by_category_dict, sector_bases, high_heat_shares)
 
     # Save the detailed results by facility unit and fuel type
     breakdown_by_fuel_df.to_csv(logs_path / f'{year}_unadjusted_demand_by_unit_fuel.csv', index=False)
-    results_by_facility_df.to_csv(logs_path / f'{year}_unadjusted_demand_by_facility.csv', index = False)
+    results_by_facility_df.to_csv(logs_path / f'{year}_unadjusted_demand_by_facility.csv', index=False)
 
     """
     # Save an output of the total fuel consumption by sector and fuel
@@ -343,9 +390,12 @@ def model_one_year(existing_h2_pct_decarb, high_temp_decarb_by_sector, year):
     average_facility_proj_demand_by_sector = wecc_results_by_facility.groupby('Sector')['proj_fuel_demand_mmBtu'].mean()
     average_facility_demand_by_sector = wecc_results_by_facility.groupby('Sector')['fuel_demand_mmBtu'].mean()
 
+    # Collect the facilities with missing data, to be added to the results once all sectors are processed
+    missing_facilities = []
+
     # Iterate through the files containing the facilities with missing data for each sector
     for file_path in missing_combustion_data_folder.glob('*csv'):
-        missing_facilities_df = pd.read_csv(file_path)
+        missing_facilities_df = pd.read_csv(file_path, engine='pyarrow')
 
         if missing_facilities_df.empty:
             continue
@@ -361,45 +411,51 @@ def model_one_year(existing_h2_pct_decarb, high_temp_decarb_by_sector, year):
                     'Longitude', 'fuel_demand_mmBtu', 'proj_fuel_demand_mmBtu', 'inWestCensus', 'inWECC']].rename(columns={'Primary NAICS Code': 'NAICS Code'})
         
         # Add results to the running list
-        results_by_facility_df = pd.concat([results_by_facility_df, missing_facilities_df])
+        missing_facilities.append(missing_facilities_df)
+
+    results_by_facility_df = pd.concat([results_by_facility_df, *missing_facilities], ignore_index=True)
 
     #========================
     # Step 3: Handle discrepancies in fuel consumption between our data and fuel use totals from the EIA MECS
     #========================
     
     # Calculate the discrepancy in fuel use for each sector in the West Census Region (similar to the WECC)
-    discrepancies_by_sector = calc_discrepancies(results_by_facility_df)
+    discrepancies_by_sector = calc_discrepancies(results_by_facility_df, year, mecs_fuel_data)
 
-    # Iterate by sector to handle the discrepancies
-    for sector in sector_by_naics.keys():
-        sector_row = discrepancies_by_sector[discrepancies_by_sector['Sector'] == sector].iloc[0]
-        discrepancy_mmbtu = sector_row['discrepancy_mmbtu']
+    # Collect the non-GHGRP facilities used to fill in unaccounted-for demand
+    extra_facilities = []
 
-        # If we overestimate fuel consumption, we adjust by scaling down our estimates uniformly across all facilities in that sector
-        if discrepancy_mmbtu < 0:
-            # Get the scaling factor
-            mecs_to_ghgrp_ratio = sector_row['mecs_to_ghgrp_ratio']
+    discrepancies_by_sector = discrepancies_by_sector.set_index('Sector')
 
-            # Scale down fuel demand (and projected fuel demand) accordingly
-            results_by_facility_df.loc[results_by_facility_df['Sector'] == sector, 'fuel_demand_mmBtu'] *= mecs_to_ghgrp_ratio
-            results_by_facility_df.loc[results_by_facility_df['Sector'] == sector, 'proj_fuel_demand_mmBtu'] *= mecs_to_ghgrp_ratio
+    # If we overestimate fuel consumption in a sector, we adjust by scaling down our estimates uniformly across all 
+    # facilities in that sector. The scaling factors of all sectors are applied to the fuel demand (and projected 
+    # fuel demand) in a single pass
+    overestimated_sectors = discrepancies_by_sector[discrepancies_by_sector['discrepancy_mmbtu'] < 0]
+    scaling_by_sector = overestimated_sectors['mecs_to_ghgrp_ratio'].to_dict()
+
+    if scaling_by_sector:
+        scaling = results_by_facility_df['Sector'].map(scaling_by_sector).to_numpy(dtype=float, na_value=1.0)
+        results_by_facility_df['fuel_demand_mmBtu'] *= scaling
+        results_by_facility_df['proj_fuel_demand_mmBtu'] *= scaling
+
+    # Iterate by sector to handle the remaining discrepancies
+    for sector in sector_by_naics.keys():
+        discrepancy_mmbtu = discrepancies_by_sector.at[sector, 'discrepancy_mmbtu']
 
         # If our estimates are low, we adjust by disaggregating "unaccounted-for demand" across non-GHGRP facilities in the West Census
-        elif discrepancy_mmbtu > 0:
+        if discrepancy_mmbtu > 0:
             # Load the non-GHGRP facilities in each sector
             extra_facities_path = base_path / 'inputs' / 'extra_epa_frs_facilities_west' / f'{sector}_facilities.csv'
-            extra_facilities_df = pd.read_csv(extra_facities_path)
+            extra_facilities_df = pd.read_csv(extra_facities_path, engine='pyarrow')
 
             # Fill in the fuel demand
             extra_facilities_df['fuel_demand_mmBtu'] = discrepancy_mmbtu / len(extra_facilities_df)
 
-            high_temp_decarb_pct = high_temp_decarb_by_sector[list(sector_by_naics.keys()).index(sector)]
+            high_temp_decarb_pct = high_temp_decarb_pct_by_sector[sector]
 
-            # Apply cached function to the DataFrame
-            extra_facilities_df['proj_fuel_demand_mmBtu'] = extra_facilities_df['fuel_demand_mmBtu'].apply(
-                lambda x: cached_project_sector_consumption(sector, x, year) * high_temp_decarb_pct / 100 * \
-                    get_high_heat_emissions_share(sector)
-            )
+            # Every facility shares the same projection factor, so it is applied to the whole column at once
+            extra_facilities_df['proj_fuel_demand_mmBtu'] = extra_facilities_df['fuel_demand_mmBtu'] * \
+                sector_growth_factors[sector] * high_temp_decarb_pct / 100 * high_heat_shares[sector]
             extra_facilities_df['inWestCensus'] = True
 
             # Format to match columns in the results_by_facility_df
@@ -409,30 +465,36 @@ def model_one_year(existing_h2_pct_decarb, high_temp_decarb_by_sector, year):
                                'longitude83': 'Longitude'})
 
             # Add results to the running list
-            results_by_facility_df = pd.concat([results_by_facility_df, extra_facilities_df])
+            extra_facilities.append(extra_facilities_df)
+
+    results_by_facility_df = pd.concat([results_by_facility_df, *extra_facilities], ignore_index=True)
 
     #========================
     # Step 4: Filter for facilities in the WECC and convert hydrogen demand to kg
     #========================
 
     # Convert H2 demand from mmBtu to kg
-    results_by_facility_df['total_h2_demand_kg'] = results_by_facility_df['proj_fuel_demand_mmBtu'] * ONE_MILLION / BTU_IN_1LB_H2 * LB_TO_KG
-    results_by_facility_df['Sector'] = results_by_facility_df['NAICS Code'].map(get_sector)
+    results_by_facility_df['total_h2_demand_kg'] = results_by_facility_df['proj_fuel_demand_mmBtu'].to_numpy() * KG_H2_PER_MMBTU
+
+    # Look up the sector once per distinct NAICS code rather than once per facility
+    naics_codes = results_by_facility_df['NAICS Code']
+    results_by_facility_df['Sector'] = naics_codes.map({code: get_sector(code) for code in naics_codes.unique()}).astype(sector_dtype)
 
     # Save the combined results for the WECC and West Census Region for each of the sectors efore filtering
     results_by_facility_df.to_csv(logs_path / f'{year}_west_census_and_wecc_final_demand_by_facility.csv', index=False)
     
-    # Filter the facilities to only those within WECC bundaries
-    filtered_df = results_by_facility_df[results_by_facility_df['inWECC'] == True].copy()
+    # Filter the facilities to only those within WECC bundaries. The filtered frame is not modified before it is
+    # concatenated below, so it does not need its own copy
+    filtered_df = results_by_facility_df.loc[results_by_facility_df['inWECC'] == True]
     
     #========================
     # Step 5: Include demand from existing hydrogen facilities
     #========================
-    existing_h2_plants_df = pd.read_csv(existing_h2_plants_path)
+    existing_h2_plants_df = pd.read_csv(existing_h2_plants_path, engine='pyarrow')
 
     existing_h2_plants_df['inWECC'] = True
     existing_h2_plants_df['total_h2_demand_kg'] = existing_h2_plants_df['hydrogen_demand_kg'] * existing_h2_pct_decarb / 100
-    existing_h2_plants_df['Sector'] = 'Existing Hydrogen Plants'
+    existing_h2_plants_df['Sector'] = pd.Series('Existing Hydrogen Plants', index=existing_h2_plants_df.index, dtype=sector_dtype)
 
     existing_h2_plants_df = existing_h2_plants_df.rename(columns={'Primary NAICS Code': 'NAICS Code'})
     existing_h2_plants_df = existing_h2_plants_df[['Facility Id', 'Facility Name', 'NAICS Code', 'Sector', 'Latitude', \
@@ -451,176 +513,316 @@ def model_one_year(existing_h2_pct_decarb, high_temp_decarb_by_sector, year):
     # Create the raster output for the 5x5km resolution of industry demand
     aggregate_and_plot.create_demand_grid(filtered_df, year)
 
-    filtered_df.to_csv(logs_path / f'{year}_wecc_final_demand_by_facility.csv', index = False)
+    filtered_df.to_csv(logs_path / f'{year}_wecc_final_demand_by_facility.csv', index=False)
     aggregated_by_lz['year'] = year
 
     return aggregated_by_lz
 
 
-def calc_epa_ghgrp_fuel_consumption(high_temp_pct_decarb_by_sector: list, fuel_growth_by_category_dict: dict):
+def calc_epa_ghgrp_fuel_consumption(high_temp_pct_decarb_by_sector: dict, fuel_growth_by_category_dict: dict, 
+                                    sector_bases: dict, high_heat_shares: dict):
     """
     Estimates fuel consumption for industrial facilities in the West Census Region and the WECC
     based on CO2 emissions, fuel type, and decarbonization projections. Generates both facility-level 
     totals and detailed unit-level breakdowns by facility units and fuel types.
 
     Parameters:
-    high_temp_pct_decarb_by_sector (list of float):
-        The percent decarbonization of projected high-temp combustion fuel-use applied to each sector. 
-        The order should correspond to the keys in 'sector_by_naics'
+    high_temp_pct_decarb_by_sector (dict):
+        A mapping of each sector (a key in 'sector_by_naics') to the percent decarbonization of projected 
+        high-temp combustion fuel-use applied to it.
     fuel_growth_by_category_dict (dict):
         A mapping of EIA fuel categories to projected growth factors between the baseline year 
         (2022) and the model year.
+    sector_bases (dict):
+        The base year fuel consumption of each sector, from get_sector_fuel_consumption.
+    high_heat_shares (dict):
+        A mapping of each sector to its share of high-temp combustion emissions.
 
     Returns:
     all_results_by_facility (DataFrame):
         Contains facility-level fuel consumption and projected fuel demand.
 
-    breakdown_by_fuel (list of dict):
-        A detailed list of fuel consumption by individual units within each facility. 
+    breakdown_by_fuel (DataFrame):
+        A detailed breakdown of fuel consumption by individual units and fuels within each facility. 
 
     Notes:
     - Units with missing fuel types are assumed to use Natural Gas by default.
     - Biofuels are excluded from fuel demand calculations.
     """
 
-    # Create a dictionary mapping the fuel type to the CO2 emissions factor
-    fuel_emissions_df = pd.read_excel(fuel_emissions_factor_path)
-    fuel_emissions_dict = fuel_emissions_df.set_index('Fuel Type')['kg CO2 per mmBtu'].to_dict()
+    # The year-independent part of the calculation (reading the GHGRP breakdowns and converting unit emissions to fuel
+    # demand) is only done once, so each model year just projects the base fuel demand of each sector
+    sector_results = []
+    for sector_name, sector_base in sector_bases.items():
+        high_temp_decarb_pct = high_temp_pct_decarb_by_sector[sector_name]
 
-    # Create a dictionary mapping each fuel type to a broader fuel category for which we have fuel consumption projections
-    aeo_fuel_category_dict = fuel_emissions_df.set_index('Fuel Type')['EIA AEO Category'].to_dict() 
+        sector_results.append(project_sector_fuel_demand(
+            sector_base, high_temp_decarb_pct / 100, high_heat_shares[sector_name],
+            fuel_growth_by_category_dict))
 
-    # Create a DataFrame for the results for hydrogen demand from each facility
-    all_results_by_facility = pd.DataFrame()
+    # Collect the results for hydrogen demand from each facility, and a more detailed breakdown by facility unit
+    # and fuel type, for each sector
+    results_by_sector = [industry_results_df for industry_results_df, _ in sector_results]
+    breakdown_by_sector = [sector_breakdown_df for _, sector_breakdown_df in sector_results]
 
-    # Create a list for a more detailed breakdown by facility unit and fuel type
-    breakdown_by_fuel = []
-    
-    # Process each industry
-    for file_name in os.listdir(units_and_fuel_folder):
-        if not file_name.endswith('.csv') or file_name.startswith('~$'):
-            continue
-        
-        sector_name = file_name.replace('_facilities_breakdown.csv', '')
+    all_results_by_facility = pd.concat(results_by_sector, ignore_index=True) if results_by_sector else pd.DataFrame()
+    breakdown_by_fuel = pd.concat(breakdown_by_sector, ignore_index=True) if breakdown_by_sector else pd.DataFrame()
+
+    # The breakdown repeats a handful of sectors, NAICS codes and fuels over every unit and fuel row
+    if breakdown_by_sector:
+        breakdown_by_fuel = breakdown_by_fuel.astype({'Sector': sector_dtype, 'NAICS Code': 'category', 'Fuel': 'category'})
+
+    return all_results_by_facility, breakdown_by_fuel
 
-        results_by_sector = []
-        industry_facilities_df = pd.read_csv(base_path / units_and_fuel_folder / file_name)
 
-        if industry_facilities_df.empty:
+@lru_cache(maxsize=1)
+def get_sector_fuel_consumption():
+    """
+    Reads the GHGRP breakdown of each sector by facility unit and fuel, and estimates the base year fuel consumption
+    of every unit and fuel. None of this depends on the model year, so it is only computed once per run.
+
+    Returns:
+    - a dictionary mapping each sector name to its calc_sector_fuel_consumption result. The cached DataFrames are 
+        shared across model years and must not be modified
+    """
+    # Look up the fuel type -> CO2 emissions factor and fuel type -> AEO fuel category dictionaries
+    fuel_emissions_dict, aeo_fuel_category_dict = get_fuel_lookup_dicts()
+
+    # Sorted so that the sectors are always combined in the same order
+    with os.scandir(units_and_fuel_folder) as entries:
+        sector_files = sorted(entry.name for entry in entries
+                              if entry.is_file() and entry.name.endswith('.csv') and not entry.name.startswith('~$'))
+
+    # Process each industry. The sectors are independent, so their files are processed in parallel worker processes
+    # (only the file name and the two lookup dictionaries are sent to each worker)
+    max_workers = max(1, min(len(sector_files), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        sector_bases = executor.map(
+            partial(process_sector_file, fuel_emissions_dict=fuel_emissions_dict, aeo_fuel_category_dict=aeo_fuel_category_dict),
+            sector_files)
+
+        sector_results = list(zip(sector_files, sector_bases))
+
+    # The workers return the fuels they could not look up instead of printing them, so the messages are reported 
+    # here in file order rather than interleaved
+    sector_fuel_consumption = {}
+    for file_name, sector_result in sector_results:
+        if sector_result is None:
             continue
 
-        # Group each unit and fuel by facility
-        sector_facilities_grouped = industry_facilities_df.groupby('Facility Id')
-
-        # Process each facility in the industry
-        for facility_id, facility_df in sector_facilities_grouped:
-
-            facility_name = facility_df['Facility Name_x'].iloc[0]
-            latitude = facility_df['Latitude'].iloc[0]
-            longitude = facility_df['Longitude'].iloc[0]
-
-            # Retrieve the industry's NAICS code
-            naics = get_naics_code(int(industry_facilities_df.iloc[0]['Primary NAICS Code_y']))
-
-            inWECC = facility_df['inWECC'].iloc[0]
-            inWestCensus = facility_df['inWestCensus'].iloc[0]
-
-            proj_facility_fuel_demand_mmBtu = 0
-            facility_fuel_demand_mmBtu = 0
-
-            facility_units_grouped = facility_df.groupby('Unit Name')
-
-            # Process each unit in the facility
-            for unit_name, unit_df in facility_units_grouped:
-                
-                consumes_biofuels = False
-
-                # Assume that any missing fuel types are natural gas (the most commonly used fuel)
-                unit_df['Specific Fuel Type'] = unit_df['Specific Fuel Type'].fillna('Natural Gas')       
-
-                # Retreive the unit's total CO2 emissions
-                unit_CO2_emissions_mt = unit_df.iloc[0]['Unit CO2 emissions (non-biogenic)']
-
-                # If there are multiple fuels, find the average emissions factor and use this to
-                # calculate fuel demand in mmBtu assuming each fuel is consumed in equal quantities
-                emissions_factor_total = 0
-                
-                # Keep a running list of all the fuels that the unit consumes
-                unit_fuels = []
-
-                # Iterate across the different fuels for the unit
-                for _, fuel_df in unit_df.iterrows():  
-                    fuel = fuel_df['Specific Fuel Type']
-
-                    # Skip if the fuel is a biofuel
-                    if 'Biofuels' in aeo_fuel_category_dict[fuel]:
-                        consumes_biofuels = True
-                        continue
-
-                    # Get the emissions factor for the fuel if it exists
-                    try:
-                        unit_fuels.append(fuel)
-
-                        emissions_factor = fuel_emissions_dict[fuel]
-                        emissions_factor_total += emissions_factor
-                    except:
-                        print(f'The fuel {fuel} is not registered in the emissions factor dictionary. Skipping this unit.')
-
-                # Use the average emissions factor across all fuels to calculate the fuel demand for the unit
-                if emissions_factor_total == 0:
-                    continue 
-                
-                avg_emissions_factor = emissions_factor_total / len(unit_fuels) # emissions factor is in metric tons
-
-                high_temp_decarb_pct = high_temp_pct_decarb_by_sector[list(sector_by_naics.keys()).index(sector_name)]
-
-                high_temp_decarb_factor = high_temp_decarb_pct / 100
-
-                unit_demand_mmBtu = unit_CO2_emissions_mt * 1000 / avg_emissions_factor  # multiplying by 1000 to convert from mt to kg
-
-                if consumes_biofuels:
-                    unit_demand_mmBtu *= len(unit_fuels) / (len(unit_fuels) + 1)
-                    unit_CO2_emissions_mt *= len(unit_fuels) / (len(unit_fuels) + 1)
-
-                CO2_emissions_by_unit_fuel = unit_CO2_emissions_mt / len(unit_fuels)
-                fuel_demand_by_unit_fuel = unit_demand_mmBtu / len(unit_fuels)
-                
-                # Add detailed results to the breakdown in the logs and adjust for the model year
-                for fuel in unit_fuels:
-                    # Project fuel use for fuels that are in the EIA AEO 25 projections
-                    aeo_fuel_category = aeo_fuel_category_dict[fuel]
-
-                    if aeo_fuel_category == np.nan: 
-                        print(f'projected 0% growth for {fuel}')
-                        projected_fuel_growth = 0
-                    else:
-                        projected_fuel_growth =  fuel_growth_by_category_dict[aeo_fuel_category]
-
-                    projected_fuel_demand_mmbtu = (1 + projected_fuel_growth) * fuel_demand_by_unit_fuel * high_temp_decarb_factor \
-                        * get_high_heat_emissions_share(sector_name)
-
-                    breakdown_by_fuel.append({'Facility Id': facility_id, 'Facility Name': facility_name, 'Unit Name': unit_name, 'Fuel': fuel, \
-                                'NAICS Code': naics, 'Sector': get_sector(naics), 'Latitude': latitude, 'Longitude': longitude, 'unit_CO2_emissions': unit_CO2_emissions_mt, \
-                                'CO2_Eeissions': CO2_emissions_by_unit_fuel, \
-                                'high_temp_decarb_factor': high_temp_decarb_factor, 'high_temp_emissions_share': get_high_heat_emissions_share(sector_name), \
-                                'fuel_demand_mmBtu': fuel_demand_by_unit_fuel, 'proj_fuel_demand_mmBtu': projected_fuel_demand_mmbtu, 'avg_emissions_factor': avg_emissions_factor, \
-                                'inWestCensus': fuel_df['inWestCensus']})
-                    
-                    # Add the unit's fuel demand to the facility's running total for fuel demand, scaled by scale_demand
-                    proj_facility_fuel_demand_mmBtu += projected_fuel_demand_mmbtu
-                    facility_fuel_demand_mmBtu += fuel_demand_by_unit_fuel
-            
-            # Add the facility results to the final output result DataFrame
-            results_by_sector.append({'Facility Id': facility_id, 'Facility Name': facility_name, 'NAICS Code': naics, 'Sector': get_sector(naics), \
-                                    'Latitude': latitude, 'Longitude': longitude, 'fuel_demand_mmBtu': facility_fuel_demand_mmBtu, 'proj_fuel_demand_mmBtu': \
-                                        proj_facility_fuel_demand_mmBtu, 'inWestCensus': inWestCensus,'inWECC': inWECC})
-        
-        # Save the results for hydrogen demand by facility for each industry
-        industry_results_df = pd.DataFrame(results_by_sector)
+        sector_base, missing_fuels = sector_result
+        if missing_fuels:
+            print(f'The fuels {", ".join(map(str, missing_fuels))} are not registered in the emissions factor dictionary.')
 
-        all_results_by_facility = pd.concat([all_results_by_facility, industry_results_df])
+        sector_fuel_consumption[file_name.replace('_facilities_breakdown.csv', '')] = sector_base
 
-    return all_results_by_facility, breakdown_by_fuel
+    return sector_fuel_consumption
+
+
+def process_sector_file(file_name, fuel_emissions_dict, aeo_fuel_category_dict):
+    """
+    Reads the GHGRP breakdown of one sector by facility unit and fuel, and estimates its base year fuel consumption.
+    Defined at module level so that it can run in a worker process.
+
+    Parameters:
+    - file_name: the name of the sector's file in the units_and_fuel_folder
+    - fuel_emissions_dict: a mapping of fuel types to CO2 emissions factors (kg CO2 / mmBtu)
+    - aeo_fuel_category_dict: a mapping of fuel types to EIA AEO fuel categories
+
+    Returns:
+    - the sector's calc_sector_fuel_consumption result, or None if the file has no rows
+    """
+    file_path = units_and_fuel_folder / file_name
+    parquet_path = parquet_copy(file_path)
+    if parquet_path is not None:
+        industry_facilities_df = pd.read_parquet(parquet_path, engine='pyarrow', columns=sector_breakdown_columns)
+    else:
+        industry_facilities_df = pd.read_csv(file_path, engine='pyarrow', usecols=sector_breakdown_columns)
+
+    if industry_facilities_df.empty:
+        return None
+
+    # Keep the text columns as Arrow-backed strings rather than Python objects, so the groupby keys and fuel 
+    # lookups built from them run in Arrow's kernels
+    industry_facilities_df[sector_text_columns] = industry_facilities_df[sector_text_columns].astype('string[pyarrow]')
+
+    return calc_sector_fuel_consumption(industry_facilities_df, fuel_emissions_dict, aeo_fuel_category_dict)
+
+
+def calc_sector_fuel_consumption(industry_facilities_df, fuel_emissions_dict, aeo_fuel_category_dict):
+    """
+    Estimates the base year fuel consumption of every unit and fuel in one sector from the CO2 emissions of its 
+    units. Each unit's emissions are converted to fuel demand using the average emissions factor of the fuels it
+    consumes, assuming each fuel is consumed in equal quantities.
+
+    Parameters:
+    - industry_facilities_df: a DataFrame with one row per facility unit and fuel in the sector
+    - fuel_emissions_dict: a mapping of fuel types to CO2 emissions factors (kg CO2 / mmBtu)
+    - aeo_fuel_category_dict: a mapping of fuel types to EIA AEO fuel categories
+
+    Returns:
+    - a tuple of the sector's NAICS code, its sector name, a DataFrame of facility attributes indexed and sorted by 
+        facility, and a DataFrame with the fuel demand of each facility unit and fuel
+    - a list of the sector's fuel types that have no emissions factor
+    """
+    # The NAICS code is taken from the first row and applied to the whole sector
+    naics = get_naics_code(int(industry_facilities_df['Primary NAICS Code_y'].iat[0]))
+    sector = get_sector(naics)
+
+    # Facility attributes are taken from the first row of each facility
+    facilities_df = (
+        industry_facilities_df
+        .dropna(subset=['Facility Id'])
+        .drop_duplicates('Facility Id')
+        .sort_values('Facility Id')
+        .set_index('Facility Id')
+    )
+
+    fuels_df = industry_facilities_df.dropna(subset=['Facility Id', 'Unit Name'])[
+        ['Facility Id', 'Unit Name', 'Unit CO2 emissions (non-biogenic)', 'Specific Fuel Type', 'inWestCensus']]
+    unit_keys = ['Facility Id', 'Unit Name']
+
+    # Assume that any missing fuel types are natural gas (the most commonly used fuel). There are only a handful of
+    # distinct fuel types, so the lookups are done once per fuel type and broadcast to the rows by category code
+    fuels = fuels_df['Specific Fuel Type'].fillna('Natural Gas').astype('category')
+    fuel_types = fuels.cat.categories
+    fuel_codes = fuels.cat.codes.to_numpy()
+
+    aeo_category_by_type = np.asarray(fuel_types.map(aeo_fuel_category_dict), dtype=object)
+    is_biofuel_by_type = np.array(['Biofuels' in category if isinstance(category, str) else False
+                                   for category in aeo_category_by_type], dtype=bool)
+    emissions_factor_by_type = np.asarray(fuel_types.map(fuel_emissions_dict), dtype=float)
+
+    aeo_fuel_categories = aeo_category_by_type[fuel_codes]
+    is_biofuel = is_biofuel_by_type[fuel_codes]
+    emissions_factors = emissions_factor_by_type[fuel_codes]
+
+    # Fuels without an emissions factor still count towards their unit's number of fuels, but add nothing to its
+    # emissions factor total. They are returned so that the caller can report each of them once
+    missing_fuels = list(fuel_types[np.isnan(emissions_factor_by_type) & ~is_biofuel_by_type])
+
+    # Aggregate every unit in a single groupby. Each unit's CO2 emissions are taken from its first row, even if that
+    # value is missing ('first' skips NaN, so the other rows are blanked out before aggregating). The breakdown 
+    # reports the inWestCensus value of the unit's last row. Biofuels are excluded from the emissions factor total
+    # and the fuel count
+    is_first_unit_row = ~fuels_df.duplicated(unit_keys).to_numpy()
+    units_df = pd.DataFrame({
+        'Facility Id': fuels_df['Facility Id'],
+        'Unit Name': fuels_df['Unit Name'],
+        'Unit CO2 emissions (non-biogenic)': np.where(is_first_unit_row, fuels_df['Unit CO2 emissions (non-biogenic)'], np.nan),
+        'inWestCensus': fuels_df['inWestCensus'],
+        'consumes_biofuels': is_biofuel,
+        'emissions_factor': np.where(is_biofuel, np.nan, emissions_factors),
+        'is_counted_fuel': ~is_biofuel
+    }).groupby(unit_keys).agg(**{
+        'Unit CO2 emissions (non-biogenic)': ('Unit CO2 emissions (non-biogenic)', 'first'),
+        'inWestCensus': ('inWestCensus', 'last'),
+        'consumes_biofuels': ('consumes_biofuels', 'any'),
+        'emissions_factor_total': ('emissions_factor', 'sum'),
+        'num_fuels': ('is_counted_fuel', 'sum')
+    })
+
+    # Skip units without an emissions factor (e.g. units that only consume biofuels)
+    units_df = units_df[units_df['emissions_factor_total'] != 0]
+
+    num_fuels = units_df['num_fuels'].to_numpy()
+    avg_emissions_factor = units_df['emissions_factor_total'].to_numpy() / num_fuels # emissions factor is in metric tons
+
+    # Multiplying by 1000 to convert from mt to kg. Units that also consume biofuels have their emissions and fuel
+    # demand scaled down to the share of non-biofuels
+    biofuel_scaling = np.where(units_df['consumes_biofuels'].to_numpy(), num_fuels / (num_fuels + 1), 1.0)
+    unit_CO2_emissions_mt = units_df['Unit CO2 emissions (non-biogenic)'].to_numpy() * biofuel_scaling
+    unit_demand_mmBtu = units_df['Unit CO2 emissions (non-biogenic)'].to_numpy() * 1000 / avg_emissions_factor * biofuel_scaling
+
+    units_df = units_df.assign(
+        unit_CO2_emissions=unit_CO2_emissions_mt,
+        CO2_Eeissions=unit_CO2_emissions_mt / num_fuels,
+        fuel_demand_mmBtu=unit_demand_mmBtu / num_fuels,
+        avg_emissions_factor=avg_emissions_factor
+    )
+
+    # Split each unit's fuel demand equally across its non-biofuel fuels
+    non_biofuels_df = pd.DataFrame({
+        'Facility Id': fuels_df['Facility Id'],
+        'Unit Name': fuels_df['Unit Name'],
+        'Fuel': fuels,
+        'aeo_fuel_category': pd.Categorical(aeo_fuel_categories)
+    })[~is_biofuel]
+    breakdown_df = non_biofuels_df.join(units_df, on=unit_keys, how='inner').sort_values(unit_keys, kind='stable')
+
+    return (naics, sector, facilities_df, breakdown_df), missing_fuels
+
+
+def project_sector_fuel_demand(sector_base, high_temp_decarb_factor, high_heat_share, fuel_growth_by_category_dict):
+    """
+    Projects the base year fuel consumption of one sector into a model year, and scales it down to the high-temp 
+    combustion fuel use that is decarbonized with hydrogen.
+
+    Parameters:
+    - sector_base: the sector's calc_sector_fuel_consumption result
+    - high_temp_decarb_factor: the fraction of projected high-temp combustion fuel use decarbonized with hydrogen
+    - high_heat_share: the share of the sector's combustion emissions from high-temp heat
+    - fuel_growth_by_category_dict: a mapping of EIA AEO fuel categories to projected growth from 2022
+
+    Returns:
+    - a DataFrame with the fuel demand and projected fuel demand of each facility, sorted by facility
+    - a DataFrame breaking the fuel demand down by facility unit and fuel
+    """
+    naics, sector, facilities_df, breakdown_df = sector_base
+
+    # The projection runs on plain float arrays, with the two sector-wide scalars folded into one factor. The growth
+    # is looked up once per AEO category and gathered onto the rows by category code. Fuels without an AEO category
+    # (code -1, which picks the trailing 0) or without a projection for it are projected with 0% growth
+    aeo_fuel_categories = breakdown_df['aeo_fuel_category'].cat
+    growth_by_category = np.asarray(aeo_fuel_categories.categories.map(fuel_growth_by_category_dict), dtype=float)
+    growth_by_category = np.append(np.nan_to_num(growth_by_category, nan=0.0), 0.0)
+    projected_fuel_growth = growth_by_category[aeo_fuel_categories.codes.to_numpy()]
+    fuel_demand_mmBtu = breakdown_df['fuel_demand_mmBtu'].to_numpy()
+    proj_fuel_demand_mmBtu = fuel_demand_mmBtu * (1 + projected_fuel_growth) * (high_temp_decarb_factor * high_heat_share)
+
+    # Both outputs are assembled column-wise from the computed arrays, without copying them
+    facility_attributes = facilities_df.loc[breakdown_df['Facility Id']]
+    breakdown_df = pd.DataFrame({
+        'Facility Id': breakdown_df['Facility Id'].to_numpy(),
+        'Facility Name': facility_attributes['Facility Name_x'].to_numpy(),
+        'Unit Name': breakdown_df['Unit Name'].to_numpy(),
+        'Fuel': breakdown_df['Fuel'].to_numpy(),
+        'NAICS Code': naics,
+        'Sector': sector,
+        'Latitude': facility_attributes['Latitude'].to_numpy(),
+        'Longitude': facility_attributes['Longitude'].to_numpy(),
+        'unit_CO2_emissions': breakdown_df['unit_CO2_emissions'].to_numpy(),
+        'CO2_Eeissions': breakdown_df['CO2_Eeissions'].to_numpy(),
+        'high_temp_decarb_factor': high_temp_decarb_factor,
+        'high_temp_emissions_share': high_heat_share,
+        'fuel_demand_mmBtu': fuel_demand_mmBtu,
+        'proj_fuel_demand_mmBtu': proj_fuel_demand_mmBtu,
+        'avg_emissions_factor': breakdown_df['avg_emissions_factor'].to_numpy(),
+        'inWestCensus': breakdown_df['inWestCensus'].to_numpy()
+    }, copy=False)
+
+    # Sum the fuel demand of each facility (facilities without any counted units have zero demand)
+    facility_totals = (
+        breakdown_df
+        .groupby('Facility Id')[['fuel_demand_mmBtu', 'proj_fuel_demand_mmBtu']]
+        .sum()
+        .reindex(facilities_df.index, fill_value=0)
+    )
+
+    results_df = pd.DataFrame({
+        'Facility Id': facilities_df.index.to_numpy(),
+        'Facility Name': facilities_df['Facility Name_x'].to_numpy(),
+        'NAICS Code': naics,
+        'Sector': sector,
+        'Latitude': facilities_df['Latitude'].to_numpy(),
+        'Longitude': facilities_df['Longitude'].to_numpy(),
+        'fuel_demand_mmBtu': facility_totals['fuel_demand_mmBtu'].to_numpy(),
+        'proj_fuel_demand_mmBtu': facility_totals['proj_fuel_demand_mmBtu'].to_numpy(),
+        'inWestCensus': facilities_df['inWestCensus'].to_numpy(),
+        'inWECC': facilities_df['inWECC'].to_numpy()
+    }, copy=False)
+
+    return results_df, breakdown_df
 
 #====================
 # Main Function:
@@ -641,22 +843,35 @@ def model_industry_demand(existing_h2_pct_decarb, high_temp_pct_decarbonization,
 
     print('\n===================\nINDUSTRY H2 DEMAND\n==================')
 
-    # Final output df with all of the load zones and years
-    load_zone_summary = pd.DataFrame()
-    index = 0
+    # Create a new logs folder
+    if logs_path.exists():
+        shutil.rmtree(logs_path)
+    logs_path.mkdir()
 
-    for year in years:
-        print(f'\nProcessing year {year}...')
+    if not len(existing_h2_pct_decarb) == len(high_temp_pct_decarbonization) == len(years):
+        raise ValueError('existing_h2_pct_decarb and high_temp_pct_decarbonization must have one entry per model year')
 
-        pct_decarbonize_by_sector = high_temp_pct_decarbonization[index]
-        pct_decarbonize_existing_h2 = existing_h2_pct_decarb[index]
+    # The inputs shared by every model year are computed once per run and handed to model_one_year
+    sector_bases = get_sector_fuel_consumption()
+    mecs_fuel_data = get_mecs_fuel_data()
+    high_heat_shares = get_high_heat_emissions_shares()
+
+    # Results for each model year, combined into a final output df with all of the load zones and years. The years
+    # run one after another so that they share the cached load zones, WECC grid and spatial indexes of aggregate_and_plot
+    year_results = []
+
+    for pct_decarbonize_existing_h2, pct_decarbonize_by_sector, year in zip(
+            existing_h2_pct_decarb, high_temp_pct_decarbonization, years):
+        print(f'\nProcessing year {year}...')
 
-        year_result = model_one_year(pct_decarbonize_existing_h2, pct_decarbonize_by_sector, year)
-        load_zone_summary = pd.concat([load_zone_summary, year_result])
+        sector_growth_factors = {sector: get_sector_growth_factor(sector, year) for sector in sector_by_naics}
 
-        index += 1
+        year_result = model_one_year(pct_decarbonize_existing_h2, pct_decarbonize_by_sector, year, 
+                                     calc_fuel_growth_by_category(year), sector_growth_factors, sector_bases, 
+                                     mecs_fuel_data, high_heat_shares)
+        year_results.append(year_result)
 
-    load_zone_summary = load_zone_summary.sort_values(by=['load_zone', 'year']).reset_index(drop=True)
+    load_zone_summary = pd.concat(year_results, ignore_index=True).sort_values(by=['load_zone', 'year'], ignore_index=True)
     load_zone_summary.to_csv(load_zone_output_path, index=False)
 
     return load_zone_summary
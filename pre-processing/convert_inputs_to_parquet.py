@@ -0,0 +1,38 @@
+"""
+This script writes Parquet copies of the industry model inputs that are slow to parse: the EPA fuel emissions factor
+workbook and the sector breakdown CSVs. Each copy is written next to its original with a .parquet suffix. The industry
+module reads a copy instead of the original whenever the copy is at least as new as the original, so this script
+should be re-run after any of the original inputs are edited.
+"""
+
+import pandas as pd
+from pathlib import Path
+
+industry_inputs_path = Path(__file__).parent.parent / 'industry' / 'inputs'
+
+# Emissions factors (kg CO2 / mmBtu) for each fuel
+fuel_emissions_factor_path = industry_inputs_path / 'epa_fuel_ghg_emission_factors.xlsx'
+
+# Fuel consumption by facility unit and fuel
+units_and_fuel_folder = industry_inputs_path / 'sector_breakdown_by_unit_fuel'
+
+
+def write_parquet(df, source_path):
+    """
+    Writes the input DataFrame to a Parquet file next to its source file.
+    """
+    parquet_path = source_path.with_suffix('.parquet')
+    df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+    print(f'Wrote {parquet_path.name}')
+
+
+def main():
+    write_parquet(pd.read_excel(fuel_emissions_factor_path), fuel_emissions_factor_path)
+
+    for file_name in sorted(Path(units_and_fuel_folder).iterdir()):
+        if file_name.suffix == '.csv' and not file_name.name.startswith('~$'):
+            write_parquet(pd.read_csv(file_name, engine='pyarrow'), file_name)
+
+
+if __name__ == '__main__':
+    main()
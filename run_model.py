@@ -3,6 +3,7 @@ Use this file to run the WECC hydrogen demand model and adjust inputs.
 """
 
 from pathlib import Path
+import logging
 import shutil
 from industry import industry_h2, build_industry_profile
 from transport import transport_h2, build_transport_profile
@@ -69,6 +70,9 @@ def model_industry_sector():
 
 
 def main():
+    # Show progress messages from modules that log instead of printing (set to logging.DEBUG for diagnostics)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
     # Create a new outputs folder
     output_path = Path(__file__).parent / 'outputs'
     if output_path.exists():
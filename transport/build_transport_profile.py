@@ -3,13 +3,19 @@ This code temporally disaggregates hydrogen demand by load zone over the course
 It saves a CSV profile for each load zone and plots the profile for the zone with the highest total transport hydrogen demand.
 """
 
+import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import pyarrow as pa
+from pyarrow import csv
 from pathlib import Path
 
 base_path = Path(__file__).parent
 
+# Profiles are written with pyarrow's CSV writer. Set the WECC_H2_PYARROW_IO environment variable to 0 to fall back
+# to pandas' to_csv
+use_pyarrow_io = os.environ.get('WECC_H2_PYARROW_IO', '1') != '0'
+
 """
 The light-duty fueling profile, which has hourly values over the course of a week, is taken from a gas station fueling 
 profile used in the NREL's H2A model and found in one of their reports. (Figures 2-3, 2-4, and 2-5)
@@ -31,6 +37,9 @@ hd_hourly_profile_path = base_path / 'input_files' / 'HD_fueling_hourly_normaliz
 ld_weekly_profile_path = base_path / 'input_files' / '4-Week_Avg_Gasoline_Profiles.csv'
 hd_weekly_profile_path = base_path / 'input_files' / '4-Week_Avg_Diesel_Profiles.csv'
 
+# Day names indexed by weekday (Monday=0, Sunday=6)
+DAY_NAMES = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+
 
 def disaggregate_annual_to_hourly(annual_total, hourly_week_profile, weekly_year_profile, year):
     """
@@ -47,35 +56,30 @@ def disaggregate_annual_to_hourly(annual_total, hourly_week_profile, weekly_year
     - a DataFrame with 'datetime', 'day_of_week', and 'hourly_value' columns
     """
     # Create hourly timestamps for the year
-    hours = pd.date_range(start=f'{year}-01-01 00:00', end=f'{year}-12-31 23:00', freq='h')
-    df = pd.DataFrame({'datetime': hours})
+    hours = np.arange(f'{int(year)}-01-01T00', f'{int(year) + 1}-01-01T00', dtype='datetime64[h]')
+    hour_of_year = np.arange(len(hours))
 
     # Compute week index (week 0 = Jan 1–7, etc.)
-    days_since_start = (df['datetime'] - pd.Timestamp(f'{year}-01-01')).dt.days
-    df['week_index'] = np.clip(days_since_start // 7, 0, 52)
+    days_since_start = hour_of_year // 24
+    week_index = np.clip(days_since_start // 7, 0, 52)
 
-    # Compute hour of week index (Sunday 00:00 = 0, ..., Saturday 23:00 = 167)
-    weekday = df['datetime'].dt.weekday  # Monday=0, Sunday=6
+    # Compute hour of week index (Sunday 00:00 = 0, ..., Saturday 23:00 = 167). 1970-01-01 was a Thursday
+    weekday = (hours.astype('datetime64[D]').astype(np.int64) + 3) % 7  # Monday=0, Sunday=6
     sunday_start_weekday = (weekday + 1) % 7  # Sunday=0, Monday=1, ..., Saturday=6
-    hour = df['datetime'].dt.hour
-    df['hour_of_week'] = sunday_start_weekday * 24 + hour
-
-    # Add day_of_week string column
-    df['day_of_week'] = df['datetime'].dt.day_name()
+    hour_of_week = sunday_start_weekday * 24 + hour_of_year % 24
 
     # Normalize profiles
     hourly_week_profile_norm = hourly_week_profile / hourly_week_profile.sum()
     weekly_year_profile_norm = weekly_year_profile / weekly_year_profile.sum()
 
-    # Vectorized lookup
-    df['hourly_shape'] = hourly_week_profile_norm[df['hour_of_week'].values]
-    df['weekly_shape'] = weekly_year_profile_norm[df['week_index'].values]
-
-    # Combine shapes and scale
-    df['combined_shape'] = df['hourly_shape'] * df['weekly_shape']
-    df['hourly_value'] = df['combined_shape'] * (annual_total / df['combined_shape'].sum())
+    # Vectorized lookup, then combine shapes and scale
+    combined_shape = hourly_week_profile_norm[hour_of_week] * weekly_year_profile_norm[week_index]
 
-    return df[['datetime', 'day_of_week', 'hourly_value']]
+    return pd.DataFrame({
+        'datetime': hours.astype('datetime64[ns]'),
+        'day_of_week': DAY_NAMES[weekday],
+        'hourly_value': combined_shape * (annual_total / combined_shape.sum())
+    })
 
 
 def build_profile(lz_summary_df):
@@ -101,49 +105,49 @@ def build_profile(lz_summary_df):
     ld_fueling_weekly = ld_weekly_fueling_df['4-Week Avg U.S. Product Supplied of Finished Motor Gasoline Thousand Barrels per Day'].values
     hd_fueling_weekly = hd_weekly_fueling_df['4-Week Avg U.S. Product Supplied of Distillate Fuel Oil Thousand Barrels per Day'].values
 
+    # Work on the raw column arrays rather than through label-based row access
+    load_zones = lz_summary_df['load_zone'].to_numpy()
+    years = lz_summary_df['year'].to_numpy()
+    ld_h2_demands = lz_summary_df['LD_h2_demand'].to_numpy()
+    hd_h2_demands = lz_summary_df['HD_h2_demand'].to_numpy()
+
     # Find load zone and year combination with highest demand
-    row = lz_summary_df.loc[lz_summary_df['total_h2_demand_kg'].idxmax()]
-    highest_demand_lz = str(row['load_zone'])
-    highest_demand_year = int(row['year'])
+    i_max = int(np.nanargmax(lz_summary_df['total_h2_demand_kg'].to_numpy()))
+    highest_demand_lz = str(load_zones[i_max])
+    highest_demand_year = int(years[i_max])
 
     # Get the first load_zone in the DataFrame
-    previous_load_zone = lz_summary_df.iloc[0].loc['load_zone']
+    previous_load_zone = load_zones[0]
     
-    profile_across_years = pd.DataFrame()
+    profile_across_years = []
 
     # Process each load zone/year combination
-    for _, lz_row in lz_summary_df.iterrows():
-        load_zone = lz_row['load_zone']
-        year = lz_row['year']
-
+    for load_zone, year, ld_h2_demand, hd_h2_demand in zip(load_zones, years, ld_h2_demands, hd_h2_demands):
         # Save results when moving on to a new load zone
         if load_zone != previous_load_zone:
-            output_path = output_profiles_path / f'{previous_load_zone}_profile.csv'
-            profile_across_years = profile_across_years.sort_values(by='datetime').reset_index(drop=True)
-            profile_across_years.to_csv(output_path, index=False)
+            save_profile(profile_across_years, output_profiles_path / f'{previous_load_zone}_profile.csv')
 
             # Update for next iteration
-            profile_across_years = pd.DataFrame()
+            profile_across_years = []
             previous_load_zone = load_zone
 
-        ld_h2_demand = lz_row['LD_h2_demand']
-        hd_h2_demand = lz_row['HD_h2_demand']
-
         # Generate profiles for both LD and HD
         ld_profile = disaggregate_annual_to_hourly(ld_h2_demand, ld_fueling_hourly, ld_fueling_weekly, year)
         hd_profile = disaggregate_annual_to_hourly(hd_h2_demand, hd_fueling_hourly, hd_fueling_weekly, year)
 
-        # Combine profiles 
+        # Combine profiles, building the frame in one go from the underlying arrays
+        ld_hourly = ld_profile['hourly_value'].to_numpy()
+        hd_hourly = hd_profile['hourly_value'].to_numpy()
         merged = pd.DataFrame({
-            'datetime': ld_profile['datetime'],
-            'day_of_week': ld_profile['day_of_week'],
-            'ld_h2_demand': ld_profile['hourly_value'],
-            'hd_h2_demand': hd_profile['hourly_value']
+            'datetime': ld_profile['datetime'].to_numpy(),
+            'day_of_week': ld_profile['day_of_week'].to_numpy(),
+            'ld_h2_demand': ld_hourly,
+            'hd_h2_demand': hd_hourly,
+            'total_h2_demand_kg': ld_hourly + hd_hourly,
+            'year': np.full(len(ld_hourly), year)
         })
-        merged['total_h2_demand_kg'] = merged['ld_h2_demand'] + merged['hd_h2_demand']
-        merged['year'] = year
 
-        profile_across_years = pd.concat([profile_across_years, merged], ignore_index=True)
+        profile_across_years.append(merged)
 
         # Plot for highest demand zone/year combination
         if load_zone == highest_demand_lz and year == highest_demand_year:
@@ -151,17 +155,45 @@ def build_profile(lz_summary_df):
             plot_demand_profile(merged, load_zone, plot_output_path)
 
     # Save the profile from the last load zone
-    output_path = output_profiles_path / f'{load_zone}_profile.csv'
-    profile_across_years = profile_across_years.sort_values(by='datetime').reset_index(drop=True)
-    profile_across_years.to_csv(output_path, index=False)
+    save_profile(profile_across_years, output_profiles_path / f'{load_zone}_profile.csv')
 
     print(f'\nProfiles saved to: {output_profiles_path}')
 
 
+def save_profile(yearly_profiles, output_path):
+    """
+    Stacks the yearly profiles of one load zone in chronological order and saves them to a CSV.
+
+    Parameters:
+    - yearly_profiles: a list of DataFrames, one per model year, each with a 'datetime' column
+    - output_path: the path to which the profile should be saved
+
+    Returns: None
+    """
+    # Each yearly profile is already in chronological order and the years do not overlap, so ordering the
+    # profiles by their first timestamp is enough; the stacked frame does not need to be sorted
+    yearly_profiles = sorted(yearly_profiles, key=lambda profile: profile['datetime'].iat[0])
+    profile_across_years = pd.concat(yearly_profiles, ignore_index=True)
+
+    if not use_pyarrow_io:
+        profile_across_years.to_csv(output_path, index=False)
+        return
+
+    # Whole-second timestamps are written as 'YYYY-MM-DD HH:MM:SS', matching pandas' output
+    profile_across_years['datetime'] = profile_across_years['datetime'].astype('datetime64[s]')
+    profile_table = pa.Table.from_pandas(profile_across_years, preserve_index=False)
+    csv.write_csv(profile_table, output_path, write_options=csv.WriteOptions(quoting_style='none'))
+
+
 def plot_demand_profile(profile_df, lz_name, plot_output_path):
     """
     Plots hourly hydrogen demand for a given load zone over the model year and saves the figure.
     """
+    # Loaded on first use, with Agg since the figure is only written to disk
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     # Calculate total demand more efficiently
     total_demand = profile_df[['ld_h2_demand', 'hd_h2_demand']].sum().sum()
 
@@ -1,10 +1,22 @@
 import geopandas as gpd
-import matplotlib.pyplot as plt
+from functools import lru_cache
 from pathlib import Path
 
 base_path  = Path(__file__).parent
 load_zone_path = base_path / 'input_files' / 'load_zones' / 'load_zones.shp'
 
+@lru_cache(maxsize=1)
+def get_load_zones():
+    """
+    Reads the load zones shapefile once and caches it, so that it is not re-read for every model year.
+
+    Returns:
+    - a GeoDataFrame of the WECC load zones, with the load zone names in a 'load_zone' column
+    """
+    lz_gdf = gpd.read_file(load_zone_path)
+
+    return lz_gdf.rename(columns={'LOAD_AREA': 'load_zone'})
+
 def plot_lz_demand(demand_df, plot_output_path):
     """
     Plots the hydrogen demand for each WECC load zone in a single year.
@@ -15,10 +27,13 @@ def plot_lz_demand(demand_df, plot_output_path):
 
     Returns: None
     """
-    lz_gdf = gpd.read_file(load_zone_path)
+    # Imported lazily, with the Agg backend since the map is only saved to file
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
 
     # Step 1: Data Processing
-    lz_gdf = lz_gdf.rename(columns={'LOAD_AREA': 'load_zone'})
+    lz_gdf = get_load_zones()
 
     # Merge the datasets
     merged = lz_gdf.merge(demand_df, on='load_zone', how='left')
@@ -19,16 +19,9 @@ base_path  = Path(__file__).parent
 fuel_data_path = base_path / 'input_files' / 'eia_transport_gas_and_diesel_usage_by_state.xlsx'
 wecc_vmt_grid_path = base_path / 'input_files' / 'vmt_grid_wecc.gpkg'
 
-# Create a new logs path
+# Output paths (the logs folder is recreated at the start of each model run, not at import)
 logs_path = base_path / 'logs'
-if logs_path.exists():
-    shutil.rmtree(logs_path)
-logs_path.mkdir()
-
-# Create output paths
-logs_path = base_path / 'logs'  
 state_breakdown = logs_path / 'h2_demand_breakdown'
-state_breakdown.mkdir()
 h2_demand_by_load_zone = base_path.parent / 'outputs' / 'transport' / 'demand_by_load_zone.csv'
 
 
@@ -49,6 +42,11 @@ def model_transport_demand(ld_penetration_by_year, hd_penetration_by_year, years
 
     print('\n===================\nTRANSPORT H2 DEMAND\n==================')
 
+    # Create a new logs folder
+    if logs_path.exists():
+        shutil.rmtree(logs_path)
+    state_breakdown.mkdir(parents=True)
+
     # Conversion factors
     GAL_GASOLINE_TO_KG_H2 = 1.0  # 1 kg H2 = 1 gallon gasoline (energy equivalence)
     GAL_DIESEL_TO_KG_H2 = 1.0 / 0.9 # 1 kg H2 = 0.9 gallons diesel (energy equivalence)
@@ -56,9 +54,9 @@ def model_transport_demand(ld_penetration_by_year, hd_penetration_by_year, years
     # Load fuel consumption data by state (2023 data from the EIA)
     fuel_data = pd.read_excel(fuel_data_path)
 
-    # Create an output DataFrame that will contain the results for hydrogen demand across each load zone
-    # for every model year
-    output_load_zone_summary = pd.DataFrame()
+    # Collect the results for hydrogen demand across each load zone for every model year, to be combined
+    # into a single output DataFrame
+    year_results = []
     index = 0
 
     for year in years:
@@ -143,9 +141,9 @@ def model_transport_demand(ld_penetration_by_year, hd_penetration_by_year, years
 
         build_hydrogen_demand_grid(total_ld_h2_demand, total_hd_h2_demand, year)
 
-        output_load_zone_summary = pd.concat([output_load_zone_summary, disaggregated_by_lz], ignore_index=True)
+        year_results.append(disaggregated_by_lz)
 
-    output_load_zone_summary = output_load_zone_summary.sort_values(by=['load_zone', 'year']).reset_index(drop=True)
+    output_load_zone_summary = pd.concat(year_results, ignore_index=True).sort_values(by=['load_zone', 'year'], ignore_index=True)
 
     # Save the results for hydrogen demand by load zone
     output_load_zone_summary.to_csv(h2_demand_by_load_zone, index=False)
@@ -169,7 +167,7 @@ def disaggregate_by_load_zone(state_h2_demand, year):
     vmt_folder = base_path / 'input_files' / 'VMT_data'
     state_vmt_totals_path = base_path / 'input_files' / 'state_VMT_summary.csv'
 
-    state_vmt_totals = pd.read_csv(state_vmt_totals_path)
+    state_vmt_totals = pd.read_csv(state_vmt_totals_path, engine='pyarrow')
 
     # Create a dictionary mapping the state FIPS code to a list containing LD and HD hydrogen demand
     state_vmts_totals_dict = {
@@ -185,7 +183,7 @@ def disaggregate_by_load_zone(state_h2_demand, year):
         if not '.csv' in file_name or '~' in file_name:
             continue
 
-        state_df = pd.read_csv(vmt_folder / file_name)
+        state_df = pd.read_csv(vmt_folder / file_name, engine='pyarrow')
         state_fips = int(file_name[:2].removesuffix('_'))
 
         # Get the state totals for HD and LD VMT
@@ -204,7 +202,7 @@ def disaggregate_by_load_zone(state_h2_demand, year):
         state_df['total_h2_demand_kg'] = state_df['LD_h2_demand'] + state_df['HD_h2_demand']
 
         # Save the state-level hydrogen demand summary
-        output_path = state_breakdown / f'{year}_{file_name.removesuffix('.csv')}_summary.csv'
+        output_path = state_breakdown / f'{year}_{file_name.removesuffix(".csv")}_summary.csv'
         state_df.to_csv(output_path, index = False)
 
         # Add the h2 demand data to the load zone dictionary